@@ -0,0 +1,110 @@
+"""Correctness corpus and benchmark for utils/datetime_parser.
+
+Checks every expression in CORPUS against a fixed reference time first (exit
+code 1 on any mismatch), then times cold parses, memoized parses and parse_many.
+
+    python benchmarks/bench_datetime_parser.py --rounds 20000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import datetime_parser
+from utils.datetime_parser import parse_datetime, parse_many
+
+NOW = datetime(2025, 10, 18, 12, 0)
+
+# (expression, expected ISO datetime relative to NOW): the forms the agent prompt lists, plus edge cases
+CORPUS = [
+    # English
+    ("today 8am", "2025-10-18T08:00:00"),
+    ("tomorrow 3pm", "2025-10-19T15:00:00"),
+    ("tomorrow at 3:30 pm", "2025-10-19T15:30:00"),
+    ("6pm", "2025-10-18T18:00:00"),
+    ("8 a.m.", "2025-10-18T08:00:00"),
+    ("12am", "2025-10-18T00:00:00"),
+    ("12pm", "2025-10-18T12:00:00"),
+    ("14:00", "2025-10-18T14:00:00"),
+    ("tomorrow", "2025-10-19T09:00:00"),
+    ("tomorrow evening 7", "2025-10-19T19:00:00"),
+    ("this afternoon 2", "2025-10-18T14:00:00"),
+    ("12 night", "2025-10-18T00:00:00"),
+    ("tonight 9", "2025-10-18T21:00:00"),
+    # explicit dates (the year's digits must never become the hour)
+    ("2025-10-30 14:00", "2025-10-30T14:00:00"),
+    ("2025-10-30", "2025-10-30T09:00:00"),
+    ("10/30/2025 8:30 am", "2025-10-30T08:30:00"),
+    ("10-30-2025 5pm", "2025-10-30T17:00:00"),
+    ("2025-02-30 5pm", "2025-10-18T17:00:00"),
+    # Roman Urdu
+    ("aj 8am", "2025-10-18T08:00:00"),
+    ("kal 3pm", "2025-10-19T15:00:00"),
+    ("6 bajay", "2025-10-18T18:00:00"),
+    ("6 baje", "2025-10-18T18:00:00"),
+    ("kal 6 bajay", "2025-10-19T18:00:00"),
+    ("aj 3:30 baje", "2025-10-18T15:30:00"),
+    ("9 baje", "2025-10-18T09:00:00"),
+    ("12 bajay", "2025-10-18T12:00:00"),
+    ("sham 6 bajay", "2025-10-18T18:00:00"),
+    ("kal sham 6 bajay", "2025-10-19T18:00:00"),
+    ("aj raat 10 bajay", "2025-10-18T22:00:00"),
+    ("raat 2 baje", "2025-10-18T02:00:00"),
+    ("kal subah 7 baje", "2025-10-19T07:00:00"),
+    ("dopeher 2 baje", "2025-10-18T14:00:00"),
+    # whole-word matching: "kal"/"aj" inside other words must not shift the date
+    ("raj 5pm", "2025-10-18T17:00:00"),
+    ("kalma class 5pm", "2025-10-18T17:00:00"),
+    ("  Tomorrow   8AM ", "2025-10-19T08:00:00"),
+]
+
+
+def check_corpus() -> int:
+    failures = 0
+    for expression, expected in CORPUS:
+        got = parse_datetime(expression, NOW)
+        if got != expected:
+            failures += 1
+            print(f"❌ {expression!r}: expected {expected}, got {got}")
+    print(f"{len(CORPUS) - failures}/{len(CORPUS)} corpus expressions parsed correctly")
+    return failures
+
+
+def per_call_us(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    fn(rounds)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    if check_corpus():
+        sys.exit(1)
+
+    expressions = [e for e, _ in CORPUS]
+
+    def cold(rounds):
+        for i in range(rounds):
+            datetime_parser._parse.cache_clear()
+            parse_datetime(expressions[i % len(expressions)], NOW)
+
+    def warm(rounds):
+        for i in range(rounds):
+            parse_datetime(expressions[i % len(expressions)], NOW)
+
+    def batch(rounds):
+        parse_many((expressions[i % len(expressions)] for i in range(rounds)), NOW)
+
+    print(f"cold (no memo)  {per_call_us(cold, args.rounds):7.2f} µs/parse")
+    print(f"memoized        {per_call_us(warm, args.rounds):7.2f} µs/parse")
+    print(f"parse_many      {per_call_us(batch, args.rounds):7.2f} µs/parse")
+
+
+if __name__ == "__main__":
+    main()
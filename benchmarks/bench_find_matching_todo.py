@@ -0,0 +1,88 @@
+"""find_matching_todos at 10k todos per user: full scan + Python scoring vs. the text index.
+
+Seeds one throwaway user with N todos in the configured MongoDB (MONGODB_URI),
+ensures the declared indexes, then times both matchers on the same phrases.
+
+    python benchmarks/bench_find_matching_todo.py --todos 10000 --rounds 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.dataBase import get_db
+from config.indexes import ensure_indexes
+from repositories import todo_repository
+
+VERBS = ["buy", "call", "clean", "water", "pay", "book", "visit", "fix", "cook", "read"]
+OBJECTS = ["groceries", "mom", "plants", "bills", "car", "doctor", "kitchen", "report", "shoes", "tickets"]
+PLACES = ["market", "office", "home", "gym", "mall", "park", "bank", "clinic", "school", "station"]
+PHRASES = ["water the plants", "go for shopping", "call mom", "pay electricity bills", "book gym session"]
+
+
+async def scan_match(user_id: str, task_description: str):
+    """The pre-index matcher: load every todo and score by word overlap."""
+    todos = await get_db().todos.find({"user_id": user_id}).to_list(length=None)
+    task_keywords = set(task_description.lower().split())
+    best_match, best_score = None, 0
+    for todo in todos:
+        score = len(task_keywords & set(todo["task"].lower().split()))
+        if score > best_score:
+            best_score, best_match = score, todo
+    return best_match if best_score >= 1 else None
+
+
+async def index_match(user_id: str, task_description: str):
+    candidates = await todo_repository.search_todos(user_id, task_description, limit=5)
+    return candidates[0] if candidates else None
+
+
+async def time_matcher(matcher, user_id: str, rounds: int) -> list:
+    samples = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        await matcher(user_id, PHRASES[i % len(PHRASES)])
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main(todos: int, rounds: int):
+    db = get_db()
+    await ensure_indexes(db)
+
+    user_id = f"bench-{uuid.uuid4().hex[:8]}"
+    rng = random.Random(42)
+    docs = [
+        {
+            "user_id": user_id,
+            "task": f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} at {rng.choice(PLACES)}",
+            "city": "Lahore",
+            "planned_time": datetime(2025, 1, 1, 9),
+            "completed": rng.random() < 0.8,  # long history: most todos are done
+        }
+        for _ in range(todos)
+    ]
+    await db.todos.insert_many(docs)
+
+    try:
+        for label, matcher in (("full scan", scan_match), ("text index", index_match)):
+            samples = await time_matcher(matcher, user_id, rounds)
+            p95 = statistics.quantiles(samples, n=20)[18]
+            print(f"{label:10s} p50 {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+    finally:
+        await db.todos.delete_many({"user_id": user_id})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--todos", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.todos, args.rounds))
@@ -0,0 +1,93 @@
+"""Concurrent /my_todos throughput: blocking pymongo vs. the async repository.
+
+Seeds a throwaway user in the configured MongoDB (MONGODB_URI), then fires
+concurrent GET /my_todos requests in-process through httpx's ASGI transport.
+
+"before" mounts a copy of the old handler that calls synchronous pymongo from
+an ``async def`` endpoint; "after" hits the real ``main.app`` route.
+
+    python benchmarks/bench_my_todos.py --todos 200 --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI
+from pymongo import MongoClient
+
+from config.dataBase import DB_NAME, MONGO_URI
+from utils.utils import create_access_token, verify_token
+
+
+def build_blocking_app(sync_db) -> FastAPI:
+    """The pre-motor handler: sync pymongo inside an async endpoint."""
+    app = FastAPI()
+
+    @app.get("/my_todos")
+    async def get_my_todos(user_from_token=Depends(verify_token)):
+        todos = list(sync_db.todos.find({"user_id": user_from_token.get("user_id")}))
+        for t in todos:
+            t["_id"] = str(t["_id"])
+        return {"todos": todos, "status": "success", "count": len(todos)}
+
+    return app
+
+
+async def hammer(app, token: str, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http_client:
+        async def one():
+            async with sem:
+                resp = await http_client.get("/my_todos", headers=headers)
+                resp.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--todos", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    sync_db = MongoClient(MONGO_URI)[DB_NAME]
+    user_id = f"bench-{uuid.uuid4().hex[:8]}"
+    now = datetime.now()
+    sync_db.todos.insert_many([
+        {
+            "user_id": user_id,
+            "task": f"benchmark task {i}",
+            "city": "Lahore",
+            "planned_time": now + timedelta(hours=i),
+            "completed": i % 3 == 0,
+            "created_at": now,
+        }
+        for i in range(args.todos)
+    ])
+    token = create_access_token({"user_id": user_id, "user_name": "bench", "user_email": "bench@example.com"})
+
+    try:
+        import main as app_module  # imported late so the seed step fails fast without it
+
+        for label, app in (("before (pymongo)", build_blocking_app(sync_db)), ("after (motor)", app_module.app)):
+            elapsed = asyncio.run(hammer(app, token, args.requests, args.concurrency))
+            print(f"{label:18s} {args.requests / elapsed:8.1f} req/s  ({elapsed:.2f}s for {args.requests} requests)")
+    finally:
+        sync_db.todos.delete_many({"user_id": user_id})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Model turns and wall time per todo-creating /chat message: separate tools vs. plan_todo_tool + batching.
+
+Runs the real todo_agent tools through Runner with a scripted model in place
+of Gemini, so a model turn costs --model-latency seconds and nothing else.
+The scripts follow the agent prompt before and after the change:
+
+  before: get_weather_tool, then save_todo_tool per todo, one tool per turn
+  after:  plan_todo_tool for one todo; save_todos_batch and get_weather_tool
+          emitted together (parallel_tool_calls) for several
+
+Mongo writes and the weather lookup are stubbed with sleeps of --mongo-latency
+and --weather-latency, so no database or API keys are needed.
+
+The model turn counts are the lengths of these scripts, not something this
+benchmark measures: it checks that the tools run through Runner in that many
+turns and times them. Whether Gemini actually follows the new prompt only shows
+in live numbers: compare model_turns in /usage/summary?group_by=tools before
+and after deploying.
+
+    python benchmarks/bench_plan_todo_turns.py --model-latency 0.8 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import ModelSettings, Runner
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.usage import Usage
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+import main as app_main
+from repositories import todo_repository
+from services import weather_service
+from services.request_context import TodoRequestContext
+
+USER_ID = "bench-plan-todo"
+FINAL = "Done! Your tasks are saved and the weather looks fine."
+
+SCENARIOS = {
+    "one todo with a city": {
+        "message": "Remind me to water plants tomorrow at 8am in Lahore",
+        "before": [
+            [("get_weather_tool", {"city": "Lahore"})],
+            [("save_todo_tool", {"user_id": USER_ID, "task": "water plants", "planned_time": "tomorrow 8am",
+                                 "city": "Lahore"})],
+            FINAL,
+        ],
+        "after": [
+            [("plan_todo_tool", {"task": "water plants", "planned_time": "tomorrow 8am", "city": "Lahore"})],
+            FINAL,
+        ],
+    },
+    "three todos, one city": {
+        "message": "add gym 6am, groceries 5pm and call mom 9pm in Lahore",
+        "before": [
+            [("get_weather_tool", {"city": "Lahore"})],
+            [("save_todo_tool", {"user_id": USER_ID, "task": "gym", "planned_time": "6am", "city": "Lahore"})],
+            [("save_todo_tool", {"user_id": USER_ID, "task": "groceries", "planned_time": "5pm", "city": "Lahore"})],
+            [("save_todo_tool", {"user_id": USER_ID, "task": "call mom", "planned_time": "9pm", "city": "Lahore"})],
+            FINAL,
+        ],
+        "after": [
+            [("save_todos_batch", {"todos": [
+                {"task": "gym", "planned_time": "6am", "city": "Lahore"},
+                {"task": "groceries", "planned_time": "5pm", "city": "Lahore"},
+                {"task": "call mom", "planned_time": "9pm", "city": "Lahore"},
+            ]}),
+             ("get_weather_tool", {"city": "Lahore"})],
+            FINAL,
+        ],
+    },
+}
+
+
+class ScriptedModel(Model):
+    """Plays back one turn per call: a list of (tool, args) calls, or the final reply text."""
+
+    def __init__(self, turns: list, latency: float):
+        self.turns = list(turns)
+        self.latency = latency
+
+    async def get_response(self, *args, **kwargs) -> ModelResponse:
+        await asyncio.sleep(self.latency)
+        turn = self.turns.pop(0)
+        if isinstance(turn, str):
+            output = [ResponseOutputMessage(
+                id=f"msg_{uuid.uuid4().hex}", type="message", role="assistant", status="completed",
+                content=[ResponseOutputText(type="output_text", text=turn, annotations=[])],
+            )]
+        else:
+            output = [ResponseFunctionToolCall(
+                id=f"fc_{uuid.uuid4().hex}", call_id=f"call_{uuid.uuid4().hex}", type="function_call",
+                name=name, arguments=json.dumps(arguments), status="completed",
+            ) for name, arguments in turn]
+        return ModelResponse(output=output, usage=Usage(requests=1), response_id=None)
+
+    async def stream_response(self, *args, **kwargs):
+        raise NotImplementedError("the benchmark only uses Runner.run")
+        yield  # pragma: no cover - makes this an async generator
+
+
+def stub_io(mongo_latency: float, weather_latency: float):
+    async def insert_todo(todo: dict) -> str:
+        await asyncio.sleep(mongo_latency)
+        return uuid.uuid4().hex[:24]
+
+    async def insert_todos(todos: list) -> list:
+        await asyncio.sleep(mongo_latency)
+        return [uuid.uuid4().hex[:24] for _ in todos]
+
+    async def get_weather(city: str) -> dict:
+        await asyncio.sleep(weather_latency)
+        return {"city": city, "condition": "Clear sky", "temperature_c": 24, "is_suitable": True, "issues": [],
+                "recommendation": "Good conditions"}
+
+    todo_repository.insert_todo = insert_todo
+    todo_repository.insert_todos = insert_todos
+    weather_service.get_weather = get_weather
+
+
+async def run_once(turns: list, message: str, model_latency: float, parallel: bool):
+    agent = app_main.build_todo_agent().clone(
+        model=ScriptedModel(turns, model_latency),
+        model_settings=ModelSettings(parallel_tool_calls=parallel),
+    )
+    start = time.perf_counter()
+    result = await Runner.run(agent, message, context=TodoRequestContext(user_id=USER_ID))
+    return len(result.raw_responses), time.perf_counter() - start
+
+
+async def bench(rounds: int, model_latency: float):
+    for name, scenario in SCENARIOS.items():
+        print(f"{name}: {scenario['message']!r}")
+        for label, parallel in (("before", False), ("after", True)):
+            runs = [await run_once(scenario[label], scenario["message"], model_latency, parallel)
+                    for _ in range(rounds)]
+            turns = runs[0][0]
+            median = statistics.median(elapsed for _, elapsed in runs)
+            print(f"  {label:6s} {turns} model turns (scripted)  {median:6.2f}s median over {rounds} runs")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--model-latency", type=float, default=0.8, help="seconds per Gemini turn")
+    parser.add_argument("--mongo-latency", type=float, default=0.02)
+    parser.add_argument("--weather-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    stub_io(args.mongo_latency, args.weather_latency)
+    print("Model turns come from scripted responses, not Gemini; only the wall times are measured.")
+    asyncio.run(bench(args.rounds, args.model_latency))
+
+
+if __name__ == "__main__":
+    main()
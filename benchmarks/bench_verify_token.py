@@ -0,0 +1,83 @@
+"""Requests/sec through Depends(verify_token): the old print + decode-every-time version vs. the cached one.
+
+Both apps expose one trivial endpoint that only depends on token verification,
+driven in-process through httpx's ASGI transport with a handful of users
+sending many requests each. No database is needed. The old version's prints
+go to /dev/null, so terminal I/O cost is not counted: the gap here is a
+lower bound.
+
+    python benchmarks/bench_verify_token.py --requests 5000 --users 20 --concurrency 50
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from jose import JWTError, jwt
+
+from utils.utils import ALGORITHM, SECRET_KEY, create_access_token, verify_token
+
+
+def verify_token_uncached(request: Request):
+    """The previous dependency: sync (threadpool hop), prints, full jwt.decode per request."""
+    auth_header = request.headers.get("Authorization")
+    print("the token", auth_header)
+    if not auth_header or not auth_header.startswith("Bearer "):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authorization header missing")
+    try:
+        payload = jwt.decode(auth_header.split(" ")[1], SECRET_KEY, algorithms=[ALGORITHM])
+        print("the fdecoded token", payload)
+        return payload
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+
+
+def build_app(dependency) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(user_from_token=Depends(dependency)):
+        return {"user_id": user_from_token.get("user_id")}
+
+    return app
+
+
+async def hammer(app, tokens: list, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http_client:
+        async def one(i: int):
+            async with sem:
+                resp = await http_client.get("/whoami", headers={"Authorization": f"Bearer {tokens[i % len(tokens)]}"})
+                resp.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    tokens = [create_access_token({"user_id": f"bench-{i}", "user_email": f"bench{i}@example.com"})
+              for i in range(args.users)]
+
+    for label, dependency in (("before (uncached)", verify_token_uncached), ("after (cached)", verify_token)):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            elapsed = asyncio.run(hammer(build_app(dependency), tokens, args.requests, args.concurrency))
+        print(f"{label:18s} {args.requests / elapsed:8.1f} req/s  ({elapsed:.2f}s for {args.requests} requests)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,53 @@
 # config/dataBase.py
+import asyncio
 import os
-from pymongo import MongoClient
+import time
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from dotenv import load_dotenv
+from utils.metrics import MongoCommandTimer
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+DB_NAME = "AgentAssistance"
 
-try:
-    # initialize client immediately
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-    client.admin.command("ping")  # quick ping to confirm connection
-    db = client["AgentAssistance"]  # select database
-    print("✅ Connected to MongoDB successfully by zuabir shezad")
-except Exception as e:
-    print("❌ Failed to connect to MongoDB:", e)
-    raise
-
-# Optional helper to get db (just in case)
-def get_db():
-    return db
+# Created on first use, not at import: a mongodb+srv:// URI resolves DNS when the
+# client is built, and a client made before a worker fork must not be shared with it.
+_client: Optional[AsyncIOMotorClient] = None
+_db: Optional[AsyncIOMotorDatabase] = None
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    """Return the database handle, creating the client on first use (lifespan, scripts, REPL)."""
+    global _client, _db
+    if _db is None:
+        _client = AsyncIOMotorClient(MONGO_URI, serverSelectionTimeoutMS=5000, event_listeners=[MongoCommandTimer()])
+        _db = _client[DB_NAME]  # select database
+    return _db
+
+
+async def ping_db(timeout: Optional[float] = None) -> float:
+    """Round-trip a ping to the server; returns the latency in seconds or raises."""
+    get_db()
+    start = time.perf_counter()
+    await asyncio.wait_for(_client.admin.command("ping"), timeout)
+    return time.perf_counter() - start
+
+
+async def connect_db():
+    """Create the client and confirm the server is reachable (called once from the app lifespan)."""
+    try:
+        latency = await ping_db()
+        print(f"✅ Connected to MongoDB successfully by zuabir shezad ({latency * 1000:.0f} ms)")
+    except Exception as e:
+        print("❌ Failed to connect to MongoDB:", e)
+        raise
+
+
+def close_db():
+    global _client, _db
+    if _client is not None:
+        _client.close()
+    _client = None
+    _db = None
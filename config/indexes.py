@@ -0,0 +1,91 @@
+# config/indexes.py
+"""Index declarations for every hot query, created idempotently at startup."""
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ASCENDING, TEXT
+from pymongo.errors import OperationFailure, PyMongoError
+
+# collection -> list of (keys, options)
+INDEXES = {
+    "todos": [
+        # paged pending/completed listing: keyset on (planned_time, _id)
+        ([("user_id", ASCENDING), ("completed", ASCENDING), ("planned_time", ASCENDING), ("_id", ASCENDING)],
+         {"name": "user_completed_planned_time_id"}),
+        # paged "all" listing and per-user counts
+        ([("user_id", ASCENDING), ("planned_time", ASCENDING), ("_id", ASCENDING)],
+         {"name": "user_planned_time_id"}),
+        # find_matching_todos: ranked $text search scoped to one user (user_id must be an equality match)
+        ([("user_id", ASCENDING), ("task", TEXT)],
+         {"name": "user_task_text", "default_language": "english"}),
+        # weather prefetch: distinct cities of pending todos due soon, across users
+        ([("completed", ASCENDING), ("planned_time", ASCENDING), ("city", ASCENDING)],
+         {"name": "completed_planned_time_city"}),
+    ],
+    "chat_sessions": [
+        # conversation memory of users idle for 30 days is dropped by the TTL monitor
+        ([("updated_at", ASCENDING)], {"name": "updated_at_ttl", "expireAfterSeconds": 30 * 24 * 3600}),
+    ],
+    "rate_limits": [
+        # a bucket untouched for a day is full again anyway; let the TTL monitor drop it
+        ([("updated_at", ASCENDING)], {"name": "updated_at_ttl", "expireAfterSeconds": 24 * 3600}),
+    ],
+    "usage": [
+        # usage summaries scan a created_at window; records older than 90 days expire
+        ([("created_at", ASCENDING)], {"name": "created_at_ttl", "expireAfterSeconds": 90 * 24 * 3600}),
+        ([("user_id", ASCENDING), ("created_at", ASCENDING)], {"name": "user_created_at"}),
+    ],
+    "users": [
+        # signup duplicate check and login lookup
+        ([("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    ],
+}
+
+# Indexes superseded by the declarations above, dropped at startup if still present.
+OBSOLETE_INDEXES = {
+    "todos": ["user_completed_planned_time"],
+}
+
+# Representative (collection, filter, sort) for each hot query, checked by
+# scripts/verify_query_plans.py. Add an entry whenever a new query path is introduced.
+HOT_QUERIES = [
+    ("todos", {"user_id": "u"}, [("planned_time", 1), ("_id", 1)]),
+    ("todos", {"user_id": "u", "completed": False}, [("planned_time", 1), ("_id", 1)]),
+    ("todos", {"user_id": "u", "completed": True}, [("planned_time", 1), ("_id", 1)]),
+    ("todos", {"user_id": "u", "planned_time": {"$gte": datetime(2025, 1, 1, 9)},
+               "$or": [{"planned_time": {"$gt": datetime(2025, 1, 1, 9)}}, {"_id": {"$gt": ObjectId("0" * 24)}}]},
+     [("planned_time", 1), ("_id", 1)]),
+    # /todos?from=&to= and the agenda
+    ("todos", {"user_id": "u", "planned_time": {"$gte": datetime(2025, 1, 1), "$lt": datetime(2025, 1, 8)}},
+     [("planned_time", 1), ("_id", 1)]),
+    ("todos", {"user_id": "u", "completed": False, "planned_time": {"$gte": datetime(2025, 1, 1), "$lt": datetime(2025, 1, 2)}},
+     [("planned_time", 1), ("_id", 1)]),
+    ("todos", {"completed": False, "planned_time": {"$gte": datetime(2025, 1, 1), "$lte": datetime(2025, 1, 2)}}, None),
+    ("todos", {"user_id": "u", "completed": False, "$text": {"$search": "go shopping"}},
+     [("score", {"$meta": "textScore"})]),
+    ("users", {"email": "someone@example.com"}, None),
+    ("geocodes", {"_id": "lahore"}, None),
+    ("chat_sessions", {"_id": "u"}, None),
+    ("rate_limits", {"_id": "chat:user:u"}, None),
+    ("usage", {"created_at": {"$gte": datetime(2025, 1, 1)}}, None),
+    ("usage", {"user_id": "u", "created_at": {"$gte": datetime(2025, 1, 1)}}, None),
+]
+
+
+async def ensure_indexes(db):
+    """Create every declared index; existing identical indexes are a no-op."""
+    for collection, names in OBSOLETE_INDEXES.items():
+        for name in names:
+            try:
+                await db[collection].drop_index(name)
+                print(f"🧹 Dropped obsolete index {name} on {collection}")
+            except OperationFailure:
+                pass  # already gone
+
+    for collection, specs in INDEXES.items():
+        for keys, options in specs:
+            try:
+                await db[collection].create_index(keys, **options)
+            except PyMongoError as e:
+                # A bad index (e.g. duplicate emails blocking the unique one) must not stop startup.
+                print(f"❌ Failed to ensure index {options.get('name')} on {collection}:", e)
+    print("✅ MongoDB indexes ensured")
@@ -1,14 +1,37 @@
 import os
+import json
+import time
 import uuid
-from fastapi import FastAPI, Request, Depends
+from fastapi import FastAPI, Request, Response, Depends, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, PlainTextResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
-from config.dataBase import db
+from config.dataBase import close_db, connect_db, get_db, ping_db
+from config.indexes import ensure_indexes
+from repositories import todo_repository
+from repositories.todo_repository import DEFAULT_PAGE_SIZE, encode_cursor
+from services import (
+    conversation_memory, geocode_cache, intent_router, llm_admission, password_hasher, todo_service, usage_accounting,
+    weather_cache, weather_prefetch, weather_service, request_context as request_context_module
+)
+from services.conversation_memory import ConversationMemory
+from services.llm_admission import LLMOverloaded
+from services.rate_limiter import limit_by_user
+from services.request_context import TodoRequestContext
+from services.todo_service import TodoInput, TodoUpdate
 from routes import auth_routes
 from utils.utils import verify_token
-import httpx
+from utils.etag import etag_matches, make_etag
+from utils.datetime_parser import parse_datetime_value
+from utils.http_client import close_http_client, start_http_client
+from utils import metrics
+from utils.llm_metrics import LLMTimingHooks
+from utils.metrics import ERRORS, MetricsMiddleware, timed_tool
+from utils.todos_html import format_planned_time, render_todos_html, stream_todos_html
 
 from agents import (
     Agent,
@@ -21,495 +44,112 @@ from agents import (
     handoff,
     trace,
     OpenAIChatCompletionsModel,
+    ModelSettings,
+    RunConfig,
+    RunContextWrapper,
+    RawResponsesStreamEvent,
+    RunItemStreamEvent,
 )
+from openai.types.responses import ResponseTextDeltaEvent
 from agents.extensions.handoff_prompt import RECOMMENDED_PROMPT_PREFIX
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-import re
-from typing import Optional
+from typing import List, Optional
+from urllib.parse import urlencode
 
 # Load environment
 load_dotenv()
 gemini_api_key = os.getenv('GOOGLE_API_KEY')
-WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
-print("apikey123", gemini_api_key)
 
-client = AsyncOpenAI(
-    api_key=gemini_api_key,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-)
+# Each model call retries 429/5xx itself (jittered exponential backoff, honouring Retry-After);
+# retrying a whole agent run instead would repeat its tool side effects.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
 
+_llm_client: Optional[AsyncOpenAI] = None
 
-# --------------------------
-# Helper Functions
-# --------------------------
 
-def parse_datetime(time_input: str) -> Optional[str]:
-    """
-    Parse natural language time input into ISO datetime string.
-    Handles: 'today', 'tomorrow', specific dates, times, and Urdu/Roman Urdu
-    """
-    time_input = time_input.lower().strip()
-    now = datetime.now()
-    
-    # Urdu/Roman Urdu mappings
-    urdu_mappings = {
-        'aj': 'today',
-        'kal': 'tomorrow',
-        'raat': 'night',
-        'subah': 'morning',
-        'dopeher': 'afternoon',
-        'sham': 'evening',
-        'bajay': '',  # means "o'clock"
-        'baje': '',
-    }
-    
-    # Replace Urdu terms with English equivalents
-    for urdu, english in urdu_mappings.items():
-        time_input = time_input.replace(urdu, english)
-    
-    # Extract time if present (e.g., "8am", "3:30pm", "14:00", "12 night")
-    time_pattern = r'(\d{1,2})(?::(\d{2}))?\s*(am|pm|night|morning|afternoon|evening)?'
-    time_match = re.search(time_pattern, time_input)
-    
-    hour = 9  # default hour
-    minute = 0
-    
-    if time_match:
-        hour = int(time_match.group(1))
-        minute = int(time_match.group(2)) if time_match.group(2) else 0
-        period = time_match.group(3)
-        
-        # Handle time periods
-        if period == 'pm' and hour != 12:
-            hour += 12
-        elif period == 'am' and hour == 12:
-            hour = 0
-        elif period == 'night':
-            if hour == 12:
-                hour = 0
-            elif hour < 6:
-                pass
-            else:
-                hour = hour if hour == 12 else hour
-        elif period == 'morning':
-            if hour == 12:
-                hour = 0
-        elif period == 'afternoon':
-            if hour != 12 and hour < 12:
-                hour += 12
-        elif period == 'evening':
-            if hour < 12:
-                hour += 12
-    
-    # Determine date
-    target_date = now.date()
-    
-    if 'tomorrow' in time_input:
-        target_date = (now + timedelta(days=1)).date()
-    elif 'today' in time_input:
-        target_date = now.date()
-    else:
-        # Try to parse specific date formats
-        date_patterns = [
-            r'(\d{4})-(\d{1,2})-(\d{1,2})',
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',
-            r'(\d{1,2})-(\d{1,2})-(\d{4})',
-        ]
-        
-        for pattern in date_patterns:
-            date_match = re.search(pattern, time_input)
-            if date_match:
-                try:
-                    if pattern == date_patterns[0]:
-                        year, month, day = map(int, date_match.groups())
-                    else:
-                        month, day, year = map(int, date_match.groups())
-                    target_date = datetime(year, month, day).date()
-                    break
-                except ValueError:
-                    continue
-    
-    # Combine date and time
-    result_datetime = datetime.combine(target_date, datetime.min.time())
-    result_datetime = result_datetime.replace(hour=hour, minute=minute)
-    
-    return result_datetime.isoformat()
-
-
-async def find_matching_todo(user_id: str, task_description: str) -> Optional[dict]:
-    """
-    Find a todo that matches the task description using fuzzy matching.
-    """
-    todos = list(db.todos.find({"user_id": user_id}))
-    
-    if not todos:
-        return None
-    
-    # Simple matching based on keywords
-    task_keywords = set(task_description.lower().split())
-    best_match = None
-    best_score = 0
-    
-    for todo in todos:
-        todo_keywords = set(todo['task'].lower().split())
-        common_words = task_keywords & todo_keywords
-        score = len(common_words)
-        
-        if score > best_score:
-            best_score = score
-            best_match = todo
-    
-    # Return match if at least 1 word matches
-    if best_score >= 1:
-        return best_match
-    
-    return None
+def get_llm_client() -> AsyncOpenAI:
+    """The Gemini client, built on first use (from the lifespan) rather than at import."""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = AsyncOpenAI(
+            api_key=gemini_api_key,
+            base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+            max_retries=LLM_MAX_RETRIES,
+        )
+    return _llm_client
 
 
-def generate_todos_html(todos: list, filter_type: str = "all") -> str:
-    """Generate HTML for displaying todos."""
-    pending_todos = [t for t in todos if not t.get('completed', False)]
-    completed_todos = [t for t in todos if t.get('completed', False)]
-    
-    if filter_type == "pending":
-        display_todos = pending_todos
-        title = "Pending Tasks"
-    elif filter_type == "completed":
-        display_todos = completed_todos
-        title = "Completed Tasks"
-    else:
-        display_todos = todos
-        title = "All Tasks"
-    
-    html = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{title}</title>
-        <style>
-            * {{
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }}
-            body {{
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                padding: 20px;
-            }}
-            .container {{
-                max-width: 900px;
-                margin: 0 auto;
-            }}
-            .header {{
-                text-align: center;
-                color: white;
-                margin-bottom: 30px;
-            }}
-            .header h1 {{
-                font-size: 2.5rem;
-                margin-bottom: 10px;
-                text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-            }}
-            .stats {{
-                display: flex;
-                justify-content: center;
-                gap: 30px;
-                margin-bottom: 30px;
-            }}
-            .stat-card {{
-                background: rgba(255,255,255,0.2);
-                backdrop-filter: blur(10px);
-                padding: 20px 30px;
-                border-radius: 15px;
-                color: white;
-                text-align: center;
-                box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-            }}
-            .stat-card h3 {{
-                font-size: 2rem;
-                margin-bottom: 5px;
-            }}
-            .stat-card p {{
-                opacity: 0.9;
-                font-size: 0.9rem;
-            }}
-            .todos {{
-                background: white;
-                border-radius: 20px;
-                padding: 30px;
-                box-shadow: 0 10px 40px rgba(0,0,0,0.2);
-            }}
-            .todo-item {{
-                background: #f8f9fa;
-                border-left: 5px solid #667eea;
-                padding: 20px;
-                margin-bottom: 15px;
-                border-radius: 10px;
-                transition: transform 0.2s, box-shadow 0.2s;
-            }}
-            .todo-item:hover {{
-                transform: translateY(-2px);
-                box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-            }}
-            .todo-item.completed {{
-                border-left-color: #28a745;
-                background: #e8f5e9;
-                opacity: 0.8;
-            }}
-            .todo-item.completed .task {{
-                text-decoration: line-through;
-                color: #666;
-            }}
-            .task {{
-                font-size: 1.2rem;
-                font-weight: 600;
-                color: #333;
-                margin-bottom: 10px;
-            }}
-            .details {{
-                display: flex;
-                flex-wrap: wrap;
-                gap: 15px;
-                font-size: 0.9rem;
-                color: #666;
-            }}
-            .detail-item {{
-                display: flex;
-                align-items: center;
-                gap: 5px;
-            }}
-            .detail-item::before {{
-                content: '•';
-                color: #667eea;
-                font-weight: bold;
-            }}
-            .status-badge {{
-                display: inline-block;
-                padding: 5px 15px;
-                border-radius: 20px;
-                font-size: 0.8rem;
-                font-weight: 600;
-                margin-left: auto;
-            }}
-            .status-badge.completed {{
-                background: #28a745;
-                color: white;
-            }}
-            .status-badge.pending {{
-                background: #ffc107;
-                color: #333;
-            }}
-            .empty-state {{
-                text-align: center;
-                padding: 60px 20px;
-                color: #999;
-            }}
-            .empty-state svg {{
-                width: 120px;
-                height: 120px;
-                margin-bottom: 20px;
-                opacity: 0.3;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>📝 {title}</h1>
-                <p>Manage your tasks efficiently</p>
-            </div>
-            
-            <div class="stats">
-                <div class="stat-card">
-                    <h3>{len(todos)}</h3>
-                    <p>Total Tasks</p>
-                </div>
-                <div class="stat-card">
-                    <h3>{len(pending_todos)}</h3>
-                    <p>Pending</p>
-                </div>
-                <div class="stat-card">
-                    <h3>{len(completed_todos)}</h3>
-                    <p>Completed</p>
-                </div>
-            </div>
-            
-            <div class="todos">
-    """
-    
-    if not display_todos:
-        html += """
-                <div class="empty-state">
-                    <svg viewBox="0 0 24 24" fill="none" stroke="currentColor">
-                        <path d="M9 5H7a2 2 0 00-2 2v12a2 2 0 002 2h10a2 2 0 002-2V7a2 2 0 00-2-2h-2M9 5a2 2 0 002 2h2a2 2 0 002-2M9 5a2 2 0 012-2h2a2 2 0 012 2" stroke-width="2" stroke-linecap="round"/>
-                    </svg>
-                    <h2>No tasks found</h2>
-                    <p>Start adding tasks to see them here</p>
-                </div>
-        """
-    else:
-        for todo in display_todos:
-            completed = todo.get('completed', False)
-            completed_class = "completed" if completed else ""
-            status = "completed" if completed else "pending"
-            
-            task = todo.get('task', 'Untitled')
-            city = todo.get('city', 'N/A')
-            
-            # Format time
-            planned_time = todo.get('planned_time', '')
-            try:
-                dt = datetime.fromisoformat(planned_time)
-                formatted_time = dt.strftime("%b %d, %Y at %I:%M %p")
-            except:
-                formatted_time = planned_time
-            
-            html += f"""
-                <div class="todo-item {completed_class}">
-                    <div class="task">{task}</div>
-                    <div class="details">
-                        <div class="detail-item">📍 {city}</div>
-                        <div class="detail-item">🕐 {formatted_time}</div>
-                        <span class="status-badge {status}">{status.upper()}</span>
-                    </div>
-                </div>
-            """
-    
-    html += """
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    
-    return html
+async def close_llm_client():
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.close()
+        _llm_client = None
 
 
 # --------------------------
 # Define TOOLS
 # --------------------------
 
+TODO_AGENT_MODEL = "gemini-2.0-flash"
+# Lets the model emit independent tool calls in one turn; the runner executes them concurrently
+LLM_PARALLEL_TOOL_CALLS = os.getenv("LLM_PARALLEL_TOOL_CALLS", "true").lower() == "true"
+LLM_HOOKS = LLMTimingHooks()  # times every model call into llm_call_duration_seconds
+AGENT_PAGE_SIZE = 20  # todos per list_todos_tool call; keeps tool output small for the model
+
 @function_tool
-async def save_todo_tool(user_id: str, task: str, planned_time: str = None, city: str = None):
+@timed_tool
+async def save_todo_tool(ctx: RunContextWrapper[TodoRequestContext], user_id: str, task: str,
+                         planned_time: str = None, city: str = None):
     """
     Save a todo with parsed datetime.
     planned_time should be in natural language (e.g., 'today 8am', 'tomorrow 3pm', '2025-10-30 14:00')
     """
-    if not task:
-        return {"message": "Please provide a task description."}
-    if planned_time is None:
-        return {"message": "Please provide a planned time for the task."}
+    result = await todo_service.save_todo(user_id, task, planned_time, city)
+    ctx.context.invalidate()
+    return result
 
-    # Parse the datetime
-    parsed_datetime = parse_datetime(planned_time)
-    
-    todo = {
-        "user_id": user_id,
-        "task": task,
-        "city": city,
-        "planned_time": parsed_datetime,
-        "completed": False,
-        "created_at": datetime.utcnow().isoformat(),
-    }
-    db.todos.insert_one(todo)
-    
-    # Format for display
-    dt = datetime.fromisoformat(parsed_datetime)
-    formatted_time = dt.strftime("%B %d, %Y at %I:%M %p")
-    
-    return {"message": f"✅ Task '{task}' saved successfully for {formatted_time} in {city or 'unspecified city'}."}
+
+@function_tool
+@timed_tool
+async def plan_todo_tool(ctx: RunContextWrapper[TodoRequestContext], task: str,
+                         planned_time: str = None, city: str = None):
+    """
+    Save a todo AND check the weather in its city in one step (use instead of get_weather_tool + save_todo_tool).
+    planned_time should be in natural language (e.g., 'today 8am', 'tomorrow 3pm', '2025-10-30 14:00').
+    Returns the save confirmation together with the weather verdict ('is_suitable', 'recommendation').
+    """
+    # Saved for the signed-in user, never a model-supplied id
+    result = await todo_service.plan_todo(ctx.context.user_id, task, planned_time, city)
+    if result.get("saved"):
+        ctx.context.invalidate()
+    return result
 
 
 @function_tool
+@timed_tool
 async def get_weather_tool(city: str):
     """
     Fetch weather information and analyze if conditions are suitable.
     """
-    if not city:
-        return {"error": "Please provide a city name."}
-
-    async with httpx.AsyncClient() as http_client:
-        try:
-            # Get coordinates
-            geo_resp = await http_client.get(
-                f"http://api.openweathermap.org/geo/1.0/direct",
-                params={"q": city, "limit": 1, "appid": WEATHER_API_KEY}
-            )
-            geo_data = geo_resp.json()
-
-            if not geo_data:
-                return {"error": f"City '{city}' not found."}
-
-            lat = geo_data[0]["lat"]
-            lon = geo_data[0]["lon"]
-
-            # Get weather
-            weather_resp = await http_client.get(
-                f"https://api.openweathermap.org/data/2.5/weather",
-                params={"lat": lat, "lon": lon, "appid": WEATHER_API_KEY, "units": "metric"}
-            )
-
-            weather_data = weather_resp.json()
-            condition = weather_data["weather"][0]["main"].lower()
-            description = weather_data["weather"][0]["description"].capitalize()
-            temp_c = weather_data["main"]["temp"]
-
-            # Analyze suitability
-            is_suitable = True
-            issues = []
-            
-            if condition in ["rain", "drizzle", "thunderstorm", "snow"]:
-                is_suitable = False
-                issues.append(f"precipitation ({description})")
-            
-            if temp_c > 35:
-                is_suitable = False
-                issues.append(f"extreme heat ({temp_c}°C)")
-            elif temp_c < 5:
-                is_suitable = False
-                issues.append(f"extreme cold ({temp_c}°C)")
-
-            return {
-                "city": city,
-                "condition": description,
-                "temperature_c": temp_c,
-                "is_suitable": is_suitable,
-                "issues": issues,
-                "recommendation": "Good conditions" if is_suitable else f"Not ideal: {', '.join(issues)}"
-            }
-
-        except Exception as e:
-            return {"error": str(e)}
+    return await weather_service.get_weather(city)
 
 
 @function_tool
-async def list_todos_tool(user_id: str, filter_type: str = "all"):
+@timed_tool
+async def list_todos_tool(ctx: RunContextWrapper[TodoRequestContext], user_id: str, filter_type: str = "all",
+                          limit: int = AGENT_PAGE_SIZE, cursor: Optional[str] = None):
     """
-    List todos for a user.
+    List todos for a user, soonest first, one page at a time.
     filter_type: 'all', 'pending', or 'completed'
+    cursor: pass the previous result's 'next_cursor' to get the following page.
     """
-    query = {"user_id": user_id}
-    
-    if filter_type == "pending":
-        query["completed"] = False
-    elif filter_type == "completed":
-        query["completed"] = True
-    
-    todos = list(db.todos.find(query))
+    try:
+        todos, next_cursor = await ctx.context.find_todos_page(user_id, filter_type, limit, cursor)
+    except ValueError:
+        return {"message": "That page cursor is invalid. List the todos again without a cursor."}
     
-    for t in todos:
-        t["_id"] = str(t["_id"])
-        # Format datetime for display
-        if 'planned_time' in t:
-            try:
-                dt = datetime.fromisoformat(t['planned_time'])
-                t['planned_time_formatted'] = dt.strftime("%B %d, %Y at %I:%M %p")
-            except:
-                t['planned_time_formatted'] = t['planned_time']
+    todos = [todo_service.serialize_todo(t) for t in todos]
     
     if not todos:
         return {"message": f"You have no {filter_type} todos."}
@@ -517,59 +157,43 @@ async def list_todos_tool(user_id: str, filter_type: str = "all"):
     return {
         "todos": todos,
         "count": len(todos),
-        "filter": filter_type
+        "filter": filter_type,
+        "next_cursor": next_cursor
     }
 
 
 @function_tool
-async def mark_todo_completed(user_id: str, task_description: str):
+@timed_tool
+async def mark_todo_completed(ctx: RunContextWrapper[TodoRequestContext], user_id: str, task_description: str):
     """
     Mark a todo as completed by finding it based on task description.
     """
-    # Find matching todo
-    matched_todo = await find_matching_todo(user_id, task_description)
-    
-    if not matched_todo:
-        return {
-            "success": False,
-            "message": "No matching todo found. Please be more specific or list your todos first."
-        }
-    
-    # Update to completed
-    from bson import ObjectId
-    result = db.todos.update_one(
-        {"_id": matched_todo["_id"]},
-        {"$set": {"completed": True, "completed_at": datetime.utcnow().isoformat()}}
-    )
-    
-    if result.modified_count > 0:
-        return {
-            "success": True,
-            "message": f"✅ Task '{matched_todo['task']}' marked as completed!"
-        }
-    
-    return {
-        "success": False,
-        "message": "Task was already completed or could not be updated."
-    }
+    result = await todo_service.complete_todo(user_id, task_description)
+    if result["success"]:
+        ctx.context.invalidate()
+    return result
 
 
 @function_tool
+@timed_tool
 async def find_todo_for_update(user_id: str, task_description: str):
     """
     Find a todo matching the task description for updating.
     Returns the todo with its ID if found.
     """
-    matched_todo = await find_matching_todo(user_id, task_description)
+    candidates = await todo_service.find_matching_todos(user_id, task_description)
+    
+    if todo_service.is_ambiguous(candidates):
+        return {
+            "found": False,
+            "candidates": todo_service.describe_candidates(candidates),
+            "message": "Several todos match equally well. Ask the user which one they mean."
+        }
+    
+    matched_todo = candidates[0] if candidates else None
     
     if matched_todo:
-        matched_todo["_id"] = str(matched_todo["_id"])
-        if 'planned_time' in matched_todo:
-            try:
-                dt = datetime.fromisoformat(matched_todo['planned_time'])
-                matched_todo['planned_time_formatted'] = dt.strftime("%B %d, %Y at %I:%M %p")
-            except:
-                matched_todo['planned_time_formatted'] = matched_todo['planned_time']
+        matched_todo = todo_service.serialize_todo(matched_todo)
         return {
             "found": True,
             "todo": matched_todo,
@@ -583,31 +207,29 @@ async def find_todo_for_update(user_id: str, task_description: str):
 
 
 @function_tool
-async def update_todo_tool(todo_id: str, updates: dict):
+@timed_tool
+async def update_todo_tool(ctx: RunContextWrapper[TodoRequestContext], todo_id: str, updates: dict):
     """
     Update an existing todo. 
     If updates contains 'planned_time', it will be parsed from natural language.
     """
-    from bson import ObjectId
-    
     # Parse datetime if planned_time is being updated
     if 'planned_time' in updates:
-        updates['planned_time'] = parse_datetime(updates['planned_time'])
+        updates['planned_time'] = parse_datetime_value(updates['planned_time'])
     
-    result = db.todos.update_one({"_id": ObjectId(todo_id)}, {"$set": updates})
+    # Scoped to the requesting user: the model-supplied todo_id must not reach anyone else's todo
+    user_id = ctx.context.user_id
+    modified_count = await todo_repository.update_todo(todo_id, updates, user_id)
     
-    if result.modified_count > 0:
+    if modified_count > 0:
+        ctx.context.invalidate()
         # Get updated todo for confirmation
-        updated_todo = db.todos.find_one({"_id": ObjectId(todo_id)})
+        updated_todo = await todo_repository.find_todo_by_id(todo_id, user_id)
         formatted_updates = {}
         
         for key, value in updates.items():
             if key == 'planned_time':
-                try:
-                    dt = datetime.fromisoformat(value)
-                    formatted_updates[key] = dt.strftime("%B %d, %Y at %I:%M %p")
-                except:
-                    formatted_updates[key] = value
+                formatted_updates[key] = format_planned_time(value, todo_service.DISPLAY_FORMAT)
             else:
                 formatted_updates[key] = value
         
@@ -616,14 +238,59 @@ async def update_todo_tool(todo_id: str, updates: dict):
     return {"message": "No changes were made to the todo."}
 
 
+@function_tool
+@timed_tool
+async def save_todos_batch(ctx: RunContextWrapper[TodoRequestContext], todos: List[TodoInput]):
+    """
+    Save several new todos in one call (e.g. "gym 6am, groceries 5pm and call mom 9pm").
+    Each todo has a task, a natural-language planned_time and an optional city.
+    """
+    # The batch tools write as the signed-in user only, never a model-supplied id
+    try:
+        result = await todo_service.save_todos(ctx.context.user_id, todos)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    if result["success"]:
+        ctx.context.invalidate()
+    return result
+
+
+@function_tool
+@timed_tool
+async def complete_todos_batch(ctx: RunContextWrapper[TodoRequestContext], task_descriptions: List[str]):
+    """
+    Mark several todos as completed in one call, one task description per todo.
+    """
+    try:
+        result = await todo_service.complete_todos(ctx.context.user_id, task_descriptions)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    if result["success"]:
+        ctx.context.invalidate()
+    return result
+
+
+@function_tool
+@timed_tool
+async def update_todos_batch(ctx: RunContextWrapper[TodoRequestContext], updates: List[TodoUpdate]):
+    """
+    Update several todos in one call, by todo_id (from find_todo_for_update or list_todos_tool).
+    Set only the fields that change; planned_time is natural language.
+    """
+    try:
+        result = await todo_service.update_todos(ctx.context.user_id, updates)
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    if result["success"]:
+        ctx.context.invalidate()
+    return result
+
+
 # --------------------------
 # Create Agents
 # --------------------------
 
-todo_agent = Agent(
-    name="Todo Agent",
-    handoff_description="An intelligent assistant that manages, monitors, and optimizes user todos based on weather conditions.",
-    instructions=f"""{RECOMMENDED_PROMPT_PREFIX}
+TODO_AGENT_INSTRUCTIONS = f"""{RECOMMENDED_PROMPT_PREFIX}
 You are an advanced Todo Management Agent that helps users plan their daily tasks while considering real-time weather conditions and their health-related goals.
 
 ### 🎯 Your Primary Responsibilities:
@@ -644,8 +311,11 @@ Your goal is to extract:
 
 ### 🧩 Available Tools:
 
-1. **save_todo_tool(user_id, task, planned_time, city)**  
-   → Saves a new todo. Use for creating NEW tasks.
+1. **plan_todo_tool(task, planned_time, city)**  
+   → Saves a new todo AND checks the weather in its city, in one call. Use for a NEW task with a city.
+
+   **save_todo_tool(user_id, task, planned_time, city)**  
+   → Saves a new todo. Use for creating NEW tasks without a city.
 
 2. **list_todos_tool(user_id, filter_type)**  
    → Lists todos. filter_type can be: 'all', 'pending', or 'completed'  
@@ -663,6 +333,10 @@ Your goal is to extract:
 6. **update_todo_tool(todo_id, updates)**  
    → Updates todo details (time, city, task name).
 
+7. **save_todos_batch(todos)** / **complete_todos_batch(task_descriptions)** / **update_todos_batch(updates)**  
+   → The same actions for several todos in ONE call. Use them whenever a message names more than one todo.
+   → They always act for the signed-in user; there is no user_id argument.
+
 ---
 
 ### 💪 Health & Wellness Intelligence:
@@ -698,11 +372,14 @@ You also act as a **personal wellness coach** who can:
    - Example: "go for shopping in fsd at 6pm mark my this todo as completed"
    - Try to mark it complete with `mark_todo_completed()`.
    - If it fails (todo not found), ask the user if you should create it.
+   - If it returns `candidates`, list them briefly and ask which one the user means.
 
 3. **Creating new todos:**
    - Extract task, time, and city.
-   - Always call `get_weather_tool()` when city is provided.
-   - Save the todo and confirm to user.
+   - With a city → call `plan_todo_tool()` once; it saves the todo and returns the weather. Do NOT also call `get_weather_tool()` or `save_todo_tool()`.
+   - Without a city → call `save_todo_tool()`.
+   - Confirm to the user, mentioning the weather verdict when there is one.
+   - Several todos in one message ("gym 6am, groceries 5pm and call mom 9pm in Lahore") → one `save_todos_batch()` call, not one `save_todo_tool()` per todo.
 
 4. **Updating existing todos:**
    - First call `find_todo_for_update()`.
@@ -719,14 +396,15 @@ You also act as a **personal wellness coach** who can:
 
 **DO NOT:**
 - Create a new todo when user only wants to mark existing one complete.
-- Skip the weather check when city is given.
+- Skip the weather check when city is given (`plan_todo_tool` does it for you).
 - Ignore multiple intents in one message.
 
 **ALWAYS:**
 - Analyze the entire user message (can contain multiple actions).
 - Use tools effectively and conversationally.
-- Complete all tool calls in one response.
+- Complete all tool calls in one response: emit independent calls (e.g. `get_weather_tool` for each city of a `save_todos_batch`) together in the same turn, they run concurrently.
 - Keep tone helpful, natural, and coach-like when giving wellness advice.
+- Resolve references like "that one" or "it" from the earlier conversation instead of asking again.
 
 ---
 
@@ -740,16 +418,66 @@ You also act as a **personal wellness coach** who can:
 
 Be friendly, efficient, and proactive in helping users manage their day and health.
 """
-,
-    model=OpenAIChatCompletionsModel(model="gemini-2.0-flash", openai_client=client),
-    tools=[save_todo_tool, get_weather_tool, list_todos_tool, mark_todo_completed, find_todo_for_update, update_todo_tool],
-)
+
+
+_todo_agent: Optional[Agent] = None
+
+
+def get_todo_agent() -> Agent:
+    """todo_agent, built once on first use together with its model client."""
+    global _todo_agent
+    if _todo_agent is None:
+        _todo_agent = build_todo_agent()
+    return _todo_agent
+
+
+def build_todo_agent() -> Agent:
+    return Agent(
+        name="Todo Agent",
+        handoff_description="An intelligent assistant that manages, monitors, and optimizes user todos based on weather conditions.",
+        instructions=TODO_AGENT_INSTRUCTIONS,
+        model=OpenAIChatCompletionsModel(model=TODO_AGENT_MODEL, openai_client=get_llm_client()),
+        model_settings=ModelSettings(parallel_tool_calls=LLM_PARALLEL_TOOL_CALLS),
+        tools=[plan_todo_tool, save_todo_tool, get_weather_tool, list_todos_tool, mark_todo_completed,
+               find_todo_for_update, update_todo_tool, save_todos_batch, complete_todos_batch, update_todos_batch],
+    )
 
 # --------------------------
 # FastAPI setup
 # --------------------------
 
-app = FastAPI(title="Todo AI Agent")
+STARTED_AT = time.time()
+STARTUP_TIMINGS_MS: dict = {}  # lifespan step -> duration, reported by /health/ready
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+
+
+async def startup_step(step: str, awaitable):
+    started = time.perf_counter()
+    await awaitable
+    STARTUP_TIMINGS_MS[step] = round((time.perf_counter() - started) * 1000, 1)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Every connection and client is made here, in the serving process, never at import
+    await startup_step("mongo", connect_db())
+    await startup_step("indexes", ensure_indexes(get_db()))
+    await startup_step("http_client", start_http_client())
+    started = time.perf_counter()
+    get_todo_agent()
+    STARTUP_TIMINGS_MS["agent"] = round((time.perf_counter() - started) * 1000, 1)
+    weather_prefetch.start_prefetcher()
+    try:
+        yield
+    finally:
+        await weather_prefetch.stop_prefetcher()
+        await close_http_client()
+        await close_llm_client()
+        password_hasher.shutdown()
+        close_db()
+
+
+app = FastAPI(title="Todo AI Agent", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -759,9 +487,83 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so its timings include CORS handling and the whole streamed body
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_routes.auth_router, prefix="/auth", tags=["Auth"])
+app.mount("/static", StaticFiles(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")), name="static")
 
-@app.post("/chat")
+# Check if user wants HTML view (only if format not explicitly set)
+HTML_TRIGGERS = ['show all tasks', 'show my tasks', 'give me my tasks', 'all tasks',
+                 'show pending', 'pending tasks', 'show completed', 'completed tasks',
+                 'list all', 'view tasks', 'display tasks', 'view all']
+
+
+def wants_html(user_input: str, return_format: str) -> bool:
+    return return_format == "html" or any(trigger in user_input.lower() for trigger in HTML_TRIGGERS)
+
+
+def html_filter_type(user_input: str) -> str:
+    if "pending" in user_input.lower():
+        return "pending"
+    if "completed" in user_input.lower():
+        return "completed"
+    return "all"
+
+
+def build_agent_input(user_id: str, user_email: str, user_input: str,
+                      memory: Optional[ConversationMemory] = None) -> list:
+    """Replay the compact conversation memory, then the new message with token data embedded."""
+    enriched_input = (
+        f"{user_input}\n\nUser Info:\n- ID: {user_id}\n- Email: {user_email}\n- Current Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    )
+    history = []
+    if memory is not None:
+        conversation_memory.note_replayed(memory)
+        history = memory.input_items()
+    return history + [{"content": enriched_input, "role": "user"}]
+
+
+def input_tokens_used(result) -> int:
+    """Prompt tokens over every model call of a finished run."""
+    return sum(r.usage.input_tokens for r in result.raw_responses if r.usage)
+
+
+async def run_todo_agent(user_id: str, user_email: str, user_input: str,
+                         request_context: TodoRequestContext, memory: ConversationMemory) -> Optional[str]:
+    """Run todo_agent for one message, record the turn in memory and return the reply text."""
+    with trace("Todo Agent Session", group_id=user_id):
+        # Waits for an LLM slot (or raises LLMOverloaded); the slot is freed as soon as the run ends
+        async with llm_admission.slot(user_id):
+            started = time.perf_counter()
+            # History is replayed as plain text turns (see conversation_memory), never as run items
+            result = await Runner.run(
+                get_todo_agent(), build_agent_input(user_id, user_email, user_input, memory), context=request_context,
+                hooks=LLM_HOOKS
+            )
+        usage_accounting.record_run_soon(result, user_id, "/chat", TODO_AGENT_MODEL, user_input, started)
+        
+        response = None
+        tool_outputs = []
+        
+        # Collect all message outputs and tool outputs
+        for new_item in result.new_items:
+            if isinstance(new_item, MessageOutputItem):
+                msg = ItemHelpers.text_message_output(new_item)
+                if msg and msg.strip():
+                    response = msg
+            elif isinstance(new_item, ToolCallOutputItem):
+                tool_outputs.append(new_item.output)
+        
+        # If no message response but we have tool outputs, use the last tool output
+        if not response and tool_outputs:
+            response = str(tool_outputs[-1])
+    
+    await conversation_memory.record_turn(memory, user_input, response, tool_outputs, input_tokens_used(result))
+    return response
+
+
+@app.post("/chat", dependencies=[Depends(limit_by_user("chat"))])
 async def chat_with_todo_agent(request: Request, user_from_token=Depends(verify_token)):
     # Extract user info
     user_id = user_from_token.get("user_id")
@@ -778,55 +580,40 @@ async def chat_with_todo_agent(request: Request, user_from_token=Depends(verify_
     if not user_input:
         return {"error": "Empty message."}
 
-    # Check if user wants HTML view (only if format not explicitly set)
-    html_triggers = ['show all tasks', 'show my tasks', 'give me my tasks', 'all tasks', 
-                     'show pending', 'pending tasks', 'show completed', 'completed tasks',
-                     'list all', 'view tasks', 'display tasks', 'view all']
-    
-    should_return_html = (return_format == "html" or 
-                         any(trigger in user_input.lower() for trigger in html_triggers))
+    should_return_html = wants_html(user_input, return_format)
 
-    # Embed token data inside the conversation
-    enriched_input = (
-        f"{user_input}\n\nUser Info:\n- ID: {user_id}\n- Email: {user_email}\n- Current Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-    )
+    # Request-scoped read cache shared by the tools and the HTML rendering below
+    request_context = TodoRequestContext(user_id=user_id)
 
     try:
-        with trace("Todo Agent Session", group_id=user_id):
-            # Run agent without persistent conversation history to avoid serialization issues
-            result = await Runner.run(todo_agent, [{"content": enriched_input, "role": "user"}])
-            
-            response = None
-            tool_outputs = []
-            
-            # Collect all message outputs and tool outputs
-            for new_item in result.new_items:
-                if isinstance(new_item, MessageOutputItem):
-                    msg = ItemHelpers.text_message_output(new_item)
-                    if msg and msg.strip():
-                        response = msg
-                elif isinstance(new_item, ToolCallOutputItem):
-                    tool_outputs.append(new_item.output)
-            
-            # If no message response but we have tool outputs, use the last tool output
-            if not response and tool_outputs:
-                response = str(tool_outputs[-1])
+        memory = await conversation_memory.load(user_id)
+        
+        # Simple commands are answered locally without a model round trip
+        response = await intent_router.route(user_id, user_input, request_context)
+        
+        if response is None:
+            response = await run_todo_agent(user_id, user_email, user_input, request_context, memory)
+        else:
+            await conversation_memory.record_turn(memory, user_input, response)
         
         # Check if we should return HTML
         if should_return_html:
-            # Determine filter type
-            filter_type = "all"
-            if "pending" in user_input.lower():
-                filter_type = "pending"
-            elif "completed" in user_input.lower():
-                filter_type = "completed"
+            filter_type = html_filter_type(user_input)
             
-            # Get todos and return HTML
-            todos = list(db.todos.find({"user_id": user_id}))
+            # Get the first page of todos (usually already read by list_todos_tool or the router) and return HTML
+            todos, next_cursor = await request_context.find_todos_page(user_id, filter_type, AGENT_PAGE_SIZE)
+            counts = await request_context.count_todos(user_id)
             for t in todos:
                 t["_id"] = str(t["_id"])
             
-            html_content = generate_todos_html(todos, filter_type)
+            # Rendered inside another origin's chat UI: stylesheet and links must point back at this service.
+            # "Load more" carries the next page's URL and cursor for the client to fetch with its token.
+            base_url = str(request.base_url)
+            html_content = render_todos_html(
+                todos, filter_type, counts, next_cursor,
+                lambda cursor: base_url.rstrip("/") + todos_html_page_url(filter_type, cursor, AGENT_PAGE_SIZE),
+                base_url,
+            )
             return HTMLResponse(content=html_content)
         
         return {
@@ -837,6 +624,8 @@ async def chat_with_todo_agent(request: Request, user_from_token=Depends(verify_
             )
         }
     
+    except LLMOverloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
@@ -847,31 +636,327 @@ async def chat_with_todo_agent(request: Request, user_from_token=Depends(verify_
         )
 
 
+def overloaded_response(e: LLMOverloaded) -> JSONResponse:
+    return JSONResponse(status_code=503, content={"error": str(e)}, headers={"Retry-After": str(e.retry_after)})
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def todos_view_url(request: Request, user_input: str) -> str:
+    """Absolute /todos_html link for the SSE 'final' event; the chat frontend is served from another origin."""
+    return str(request.base_url).rstrip("/") + "/todos_html?" + urlencode({"filter": html_filter_type(user_input)})
+
+
+async def stream_agent_events(request: Request, result, user_input: str, return_format: str,
+                              memory: ConversationMemory, started: float):
+    """
+    Relay a streamed agent run as Server-Sent Events:
+    'delta' (text chunks), 'tool_start' / 'tool_end', then 'final' or 'error'.
+    The run is cancelled as soon as the client disconnects; only completed turns are remembered.
+    """
+    response = None
+    tool_outputs = []
+    status = "cancelled"
+    try:
+        async for event in result.stream_events():
+            if await request.is_disconnected():
+                break
+            
+            if isinstance(event, RawResponsesStreamEvent):
+                if isinstance(event.data, ResponseTextDeltaEvent) and event.data.delta:
+                    yield sse_event("delta", {"text": event.data.delta})
+            
+            elif isinstance(event, RunItemStreamEvent):
+                item = event.item
+                if event.name == "tool_called":
+                    yield sse_event("tool_start", {
+                        "tool": getattr(item.raw_item, "name", None),
+                        "arguments": getattr(item.raw_item, "arguments", None),
+                    })
+                elif event.name == "tool_output":
+                    tool_outputs.append(item.output)
+                    yield sse_event("tool_end", {"output": item.output})
+                elif event.name == "message_output_created":
+                    msg = ItemHelpers.text_message_output(item)
+                    if msg and msg.strip():
+                        response = msg
+        else:
+            if not response and tool_outputs:
+                response = str(tool_outputs[-1])
+            final = {"reply": response or "No response generated."}
+            if wants_html(user_input, return_format):
+                final["view"] = todos_view_url(request, user_input)
+            status = "ok"
+            yield sse_event("final", final)
+            await conversation_memory.record_turn(memory, user_input, response, tool_outputs, input_tokens_used(result))
+    
+    except Exception as e:
+        import traceback
+        print(f"Error in chat stream: {traceback.format_exc()}")
+        ERRORS.inc(component="chat_stream", kind=type(e).__name__)
+        status = "error"
+        yield sse_event("error", {"error": f"An error occurred: {str(e)}"})
+    
+    finally:
+        # Client went away (or the generator was closed): stop paying for model turns
+        if not result.is_complete:
+            result.cancel()
+        usage_accounting.record_run_soon(result, memory.user_id, "/chat/stream", TODO_AGENT_MODEL, user_input,
+                                         started, status)
+
+
+@app.post("/chat/stream", dependencies=[Depends(limit_by_user("chat"))])
+async def chat_with_todo_agent_stream(request: Request, user_from_token=Depends(verify_token)):
+    """
+    Same as /chat, but streams the run as Server-Sent Events so the first tokens
+    arrive after a single model latency. HTML views are returned as a 'view' link
+    in the final event.
+    """
+    user_id = user_from_token.get("user_id")
+    user_email = user_from_token.get("user_email")
+    
+    if not user_id:
+        return JSONResponse(status_code=401, content={"message": "Unauthorized"})
+    
+    body = await request.json()
+    user_input = body.get("text", "").strip()
+    return_format = body.get("format", "json")
+    
+    if not user_input:
+        return {"error": "Empty message."}
+    
+    request_context = TodoRequestContext(user_id=user_id)
+    try:
+        memory = await conversation_memory.load(user_id)
+        routed_reply = await intent_router.route(user_id, user_input, request_context)
+        if routed_reply is not None:
+            await conversation_memory.record_turn(memory, user_input, routed_reply)
+    except Exception as e:
+        # Nothing has been streamed yet: fail the same way /chat does
+        import traceback
+        error_trace = traceback.format_exc()
+        print(f"Error in chat stream: {error_trace}")
+        ERRORS.inc(component="chat_stream", kind=type(e).__name__)
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"An error occurred: {str(e)}", "details": error_trace}
+        )
+    
+    if routed_reply is not None:
+        final = {"reply": routed_reply}
+        if wants_html(user_input, return_format):
+            final["view"] = todos_view_url(request, user_input)
+        return StreamingResponse(
+            iter([sse_event("final", final)]),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    try:
+        llm_admission.check(user_id)  # a full queue is a plain 503, before any streaming starts
+    except LLMOverloaded as e:
+        return overloaded_response(e)
+    
+    async def admitted_run():
+        # The slot is taken inside the stream, so a client that never reads it never holds one
+        try:
+            async with llm_admission.slot(user_id):
+                # The run outlives this handler, so let the runner own the trace (closed when the run ends)
+                started = time.perf_counter()
+                result = Runner.run_streamed(
+                    get_todo_agent(), build_agent_input(user_id, user_email, user_input, memory),
+                    context=request_context,
+                    hooks=LLM_HOOKS,
+                    run_config=RunConfig(workflow_name="Todo Agent Session", group_id=user_id)
+                )
+                events = stream_agent_events(request, result, user_input, return_format, memory, started)
+                try:
+                    async for chunk in events:
+                        yield chunk
+                finally:
+                    await events.aclose()  # cancel the run and record usage before the slot is freed
+        except LLMOverloaded as e:
+            yield sse_event("error", {"error": str(e), "retry_after": e.retry_after})
+    
+    return StreamingResponse(
+        admitted_run(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/chat/admission_stats")
+async def get_admission_stats():
+    """LLM slots in use and runs queued for one."""
+    return llm_admission.stats()
+
+
+@app.get("/chat/router_stats")
+async def get_router_stats():
+    """How many /chat requests the local intent router answered without the model."""
+    return intent_router.stats
+
+
+@app.get("/chat/memory_stats")
+async def get_memory_stats():
+    """Input tokens per agent turn and how much of it is replayed conversation memory."""
+    return conversation_memory.stats()
+
+
+@app.delete("/chat/session")
+async def clear_chat_session(user_from_token=Depends(verify_token)):
+    """Forget the caller's conversation memory."""
+    cleared = await conversation_memory.clear(user_from_token.get("user_id"))
+    return {"cleared": cleared}
+
+
+@app.get("/usage/summary")
+async def get_usage_summary(user_from_token=Depends(verify_token), group_by: str = "day", days: int = 7,
+                            user_id: Optional[str] = None, limit: int = 50):
+    """
+    Agent usage over the last `days` days grouped by 'day', 'user', 'tools' (tool call sequence) or 'model':
+    requests, model turns, tokens and cost, with p50/p95/p99 latency and token counts. Heaviest groups first.
+    Scoped to the caller; `user_id` and group_by='user' are for USAGE_ADMIN_USER_IDS only (403 otherwise).
+    """
+    try:
+        user_id = usage_accounting.scope_user(user_from_token.get("user_id"), user_id, group_by)
+        return {"group_by": group_by, "days": days,
+                "rows": await usage_accounting.summary(group_by, days, user_id, min(limit, 500))}
+    except PermissionError as e:
+        return JSONResponse(status_code=403, content={"error": str(e)})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+
+@app.get("/usage/heaviest")
+async def get_heaviest_runs(user_from_token=Depends(verify_token), days: int = 7,
+                            user_id: Optional[str] = None, limit: int = 20):
+    """
+    The caller's most token-hungry agent runs: prompt, tool sequence, turns, tokens and latency.
+    `user_id` (or all users, for admins when omitted) is for USAGE_ADMIN_USER_IDS only.
+    """
+    try:
+        user_id = usage_accounting.scope_user(user_from_token.get("user_id"), user_id)
+    except PermissionError as e:
+        return JSONResponse(status_code=403, content={"error": str(e)})
+    runs = await usage_accounting.heaviest_runs(days, user_id, min(limit, 200))
+    return JSONResponse(content=jsonable_encoder({"days": days, "runs": runs}))
+
+
+def cache_events() -> dict:
+    events = {}
+    for cache, cache_stats in (("weather", weather_cache.stats()), ("geocode", geocode_cache.stats()),
+                               ("todo_request", request_context_module.stats())):
+        for event in ("hits", "misses", "stale", "coalesced", "stale_served", "prefetched", "lru_hits", "db_hits"):
+            if event in cache_stats:
+                events[(cache, event)] = cache_stats[event]
+    return events
+
+
+metrics.register_collector("cache_events_total", "Cache lookups by cache and outcome", "counter",
+                           ("cache", "event"), cache_events)
+metrics.register_collector("intent_router_requests_total", "/chat requests answered locally vs. by the agent",
+                           "counter", ("outcome",), lambda: {(k,): v for k, v in intent_router.stats.items()})
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of every latency histogram and counter."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/health/live")
+async def health_live():
+    """Liveness: the process is serving requests. Checks no dependency, so it never flaps with Mongo."""
+    return {"status": "alive", "uptime_seconds": round(time.time() - STARTED_AT, 1)}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: Mongo answers a ping within HEALTH_CHECK_TIMEOUT_SECONDS and the agent is built (503 otherwise)."""
+    checks = {}
+    try:
+        latency = await ping_db(HEALTH_CHECK_TIMEOUT_SECONDS)
+        checks["mongo"] = {"ok": True, "latency_ms": round(latency * 1000, 1)}
+    except Exception as e:
+        checks["mongo"] = {"ok": False, "error": str(e) or type(e).__name__}
+    checks["agent"] = {"ok": _todo_agent is not None, "model": TODO_AGENT_MODEL, "api_key_set": bool(gemini_api_key)}
+    checks["weather"] = {"ok": True, "api_key_set": bool(weather_service.WEATHER_API_KEY)}
+
+    ready = all(check["ok"] for check in checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks, "startup_ms": STARTUP_TIMINGS_MS},
+    )
+
+
+@app.get("/weather/cache_stats")
+async def get_weather_cache_stats():
+    """Hit/miss/stale counters for the per-city weather cache."""
+    return weather_cache.stats()
+
+
+# Clients may keep the response but must revalidate it (cheaply, via If-None-Match) before reuse.
+REVALIDATE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+def todos_html_page_url(filter_type: str, cursor: Optional[str], limit: int = DEFAULT_PAGE_SIZE) -> Optional[str]:
+    """Link to the next /todos_html page, or None on the last page."""
+    if not cursor:
+        return None
+    return "/todos_html?" + urlencode({"filter": filter_type, "limit": limit, "cursor": cursor})
+
+
+async def stream_todos_ndjson(todos, limit: Optional[int]):
+    """One JSON todo per line; a final {"next_cursor": ...} line when the page is cut short."""
+    shown, last = 0, None
+    async for todo in todos:
+        if limit is not None and shown == limit:
+            yield json.dumps({"next_cursor": encode_cursor(last)}) + "\n"
+            break
+        yield json.dumps(todo_service.serialize_todo(todo), default=str) + "\n"
+        shown, last = shown + 1, todo
+
+
 @app.get("/my_todos")
-async def get_my_todos(user_from_token=Depends(verify_token), format: str = "json"):
+async def get_my_todos(request: Request, user_from_token=Depends(verify_token), format: str = "json",
+                       filter: str = "all", limit: Optional[int] = None, cursor: Optional[str] = None):
     """
-    Get user's todos.
-    format: 'json' or 'html'
+    Get the user's todos, soonest first.
+    format: 'json' (one page, default size DEFAULT_PAGE_SIZE), 'ndjson' or 'html'
+            (streamed straight from the database; everything unless `limit` is given)
+    filter: 'all', 'pending', or 'completed'
+    cursor: the previous page's 'next_cursor'
+    Sends an ETag; a matching If-None-Match gets 304 without reading any todos.
     """
     try:
         user_id = user_from_token.get("user_id")
-        todos = list(db.todos.find({"user_id": user_id}))
+        version = await todo_repository.get_version(user_id)
+        etag = make_etag(user_id, version, "my_todos", format, filter, limit, cursor)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, **REVALIDATE_HEADERS})
+        headers = {"ETag": etag, **REVALIDATE_HEADERS}
         
-        for t in todos:
-            t["_id"] = str(t["_id"])
-            if 'planned_time' in t:
-                try:
-                    dt = datetime.fromisoformat(t['planned_time'])
-                    t['planned_time_formatted'] = dt.strftime("%B %d, %Y at %I:%M %p")
-                except:
-                    t['planned_time_formatted'] = t['planned_time']
+        if format == "ndjson":
+            todos = todo_repository.stream_todos(user_id, filter, limit, cursor)
+            return StreamingResponse(stream_todos_ndjson(todos, limit), media_type="application/x-ndjson",
+                                     headers=headers)
         
         if format == "html":
-            html_content = generate_todos_html(todos, "all")
-            return HTMLResponse(content=html_content)
+            return await todos_html_response(user_id, filter, limit, cursor, headers)
         
-        return {"todos": todos, "status": "success", "count": len(todos)}
+        todos, next_cursor = await todo_repository.find_todos_page(user_id, filter, limit or DEFAULT_PAGE_SIZE, cursor)
+        todos = [todo_service.serialize_todo(t) for t in todos]
+        
+        return JSONResponse(
+            content=jsonable_encoder({"todos": todos, "status": "success", "count": len(todos), "next_cursor": next_cursor}),
+            headers=headers
+        )
     
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
@@ -882,22 +967,44 @@ async def get_my_todos(user_from_token=Depends(verify_token), format: str = "jso
         )
 
 
+async def todos_html_response(user_id: str, filter_type: str, limit: Optional[int], cursor: Optional[str],
+                              headers: Optional[dict] = None):
+    """Stream the dashboard: counts first (one grouped pass), then todos straight off the cursor."""
+    if cursor:
+        todo_repository.decode_cursor(cursor)  # reject a bad cursor before the 200 goes out
+    counts = await todo_repository.count_todos(user_id)
+    todos = todo_repository.stream_todos(user_id, filter_type, limit, cursor)
+    page_url = (lambda next_cursor: todos_html_page_url(filter_type, next_cursor, limit)) if limit else None
+    return StreamingResponse(
+        stream_todos_html(todos, filter_type, counts, limit, page_url),
+        media_type="text/html; charset=utf-8",
+        headers=headers
+    )
+
+
 @app.get("/todos_html")
-async def get_todos_html_view(user_from_token=Depends(verify_token), filter: str = "all"):
+async def get_todos_html_view(request: Request, user_from_token=Depends(verify_token), filter: str = "all",
+                              limit: Optional[int] = None, cursor: Optional[str] = None):
     """
-    Get HTML view of todos.
+    Get HTML view of todos, streamed as it is read from the database.
     filter: 'all', 'pending', or 'completed'
+    limit/cursor: optional paging; without `limit` the whole list is streamed. A page cut short ends with a
+    "Load more" button whose data-next-url / data-next-cursor the client fetches with its Authorization header.
+    Sends an ETag; a matching If-None-Match gets 304 without reading any todos.
     """
     try:
         user_id = user_from_token.get("user_id")
-        todos = list(db.todos.find({"user_id": user_id}))
-        
-        for t in todos:
-            t["_id"] = str(t["_id"])
-        
-        html_content = generate_todos_html(todos, filter)
-        return HTMLResponse(content=html_content)
+        version = await todo_repository.get_version(user_id)
+        etag = make_etag(user_id, version, "todos_html", filter, limit, cursor)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, **REVALIDATE_HEADERS})
+        return await todos_html_response(user_id, filter, limit, cursor, {"ETag": etag, **REVALIDATE_HEADERS})
     
+    except ValueError as e:
+        return HTMLResponse(
+            content=f"<html><body><h1>Bad request</h1><p>{str(e)}</p></body></html>",
+            status_code=400
+        )
     except Exception as e:
         return HTMLResponse(
             content=f"<html><body><h1>Error</h1><p>{str(e)}</p></body></html>",
@@ -905,6 +1012,141 @@ async def get_todos_html_view(user_from_token=Depends(verify_token), filter: str
         )
 
 
+def parse_range_bound(value: Optional[str], name: str) -> Optional[datetime]:
+    """ISO date or datetime query parameter -> datetime; a bare date means its midnight."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an ISO date or datetime, e.g. 2025-10-30 or 2025-10-30T14:00")
+
+
+def agenda_window(range_name: str, now: Optional[datetime] = None):
+    """[start, end) of today or of the current Monday-to-Sunday week."""
+    today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    if range_name == "today":
+        return today, today + timedelta(days=1)
+    if range_name == "week":
+        monday = today - timedelta(days=today.weekday())
+        return monday, monday + timedelta(days=7)
+    raise ValueError("range must be 'today' or 'week'")
+
+
+async def todos_range_response(request: Request, user_id: str, start: Optional[datetime], end: Optional[datetime],
+                               filter_type: str, limit: Optional[int], cursor: Optional[str], *variant):
+    """One JSON page of todos planned in [start, end), read with an index range scan."""
+    version = await todo_repository.get_version(user_id)
+    etag = make_etag(user_id, version, *variant, start, end, filter_type, limit, cursor)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, **REVALIDATE_HEADERS})
+
+    todos, next_cursor = await todo_repository.find_todos_page(
+        user_id, filter_type, limit or DEFAULT_PAGE_SIZE, cursor, start, end
+    )
+    todos = [todo_service.serialize_todo(t) for t in todos]
+    return JSONResponse(
+        content=jsonable_encoder({
+            "todos": todos,
+            "status": "success",
+            "count": len(todos),
+            "from": start,
+            "to": end,
+            "next_cursor": next_cursor,
+        }),
+        headers={"ETag": etag, **REVALIDATE_HEADERS}
+    )
+
+
+@app.get("/todos")
+async def get_todos_in_range(request: Request, user_from_token=Depends(verify_token),
+                             from_: Optional[str] = Query(None, alias="from"), to: Optional[str] = None,
+                             filter: str = "all", limit: Optional[int] = None, cursor: Optional[str] = None):
+    """
+    Get the user's todos planned from `from` (inclusive) to `to` (exclusive), soonest first.
+    from/to: ISO dates or datetimes; either may be omitted for an open range
+    filter: 'all', 'pending', or 'completed'
+    cursor: the previous page's 'next_cursor' (send the same from/to)
+    """
+    try:
+        start, end = parse_range_bound(from_, "from"), parse_range_bound(to, "to")
+        if start and end and start >= end:
+            raise ValueError("'from' must be before 'to'")
+        return await todos_range_response(request, user_from_token.get("user_id"), start, end,
+                                          filter, limit, cursor, "todos")
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        print(f"❌ Error in get_todos_in_range: {e}")
+        return JSONResponse(status_code=500, content={"error": f"Failed to fetch todos: {str(e)}"})
+
+
+@app.get("/todos/agenda")
+async def get_agenda(request: Request, user_from_token=Depends(verify_token), range: str = "today",
+                     filter: str = "all", limit: Optional[int] = None, cursor: Optional[str] = None):
+    """
+    Get today's or this week's todos, soonest first.
+    range: 'today' or 'week' (Monday to Sunday)
+    filter: 'all', 'pending', or 'completed'
+    """
+    try:
+        start, end = agenda_window(range)
+        return await todos_range_response(request, user_from_token.get("user_id"), start, end,
+                                          filter, limit, cursor, "agenda")
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        print(f"❌ Error in get_agenda: {e}")
+        return JSONResponse(status_code=500, content={"error": f"Failed to fetch agenda: {str(e)}"})
+
+
+class BulkCreateRequest(BaseModel):
+    todos: List[TodoInput]
+
+
+class BulkUpdateRequest(BaseModel):
+    updates: List[TodoUpdate]
+
+
+class BulkCompleteRequest(BaseModel):
+    task_descriptions: List[str]
+
+
+async def bulk_response(operation, user_id: str, items, success_status: int = 200):
+    try:
+        result = await operation(user_id, items)
+        return JSONResponse(status_code=success_status if result["success"] else 400, content=result)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    except Exception as e:
+        print(f"❌ Error in bulk todo operation: {e}")
+        return JSONResponse(status_code=500, content={"error": f"Bulk operation failed: {str(e)}"})
+
+
+@app.post("/todos/bulk")
+async def create_todos_bulk(body: BulkCreateRequest, user_from_token=Depends(verify_token)):
+    """
+    Create many todos with a single insert_many.
+    planned_time is natural language, as in /chat; items without a task or time are skipped.
+    """
+    return await bulk_response(todo_service.save_todos, user_from_token.get("user_id"), body.todos, 201)
+
+
+@app.patch("/todos/bulk")
+async def update_todos_bulk(body: BulkUpdateRequest, user_from_token=Depends(verify_token)):
+    """
+    Update many todos by id with a single bulk_write. Only non-null fields change;
+    {"todo_id": ..., "completed": true} completes a todo.
+    """
+    return await bulk_response(todo_service.update_todos, user_from_token.get("user_id"), body.updates)
+
+
+@app.post("/todos/bulk/complete")
+async def complete_todos_bulk(body: BulkCompleteRequest, user_from_token=Depends(verify_token)):
+    """Complete the pending todo best matching each description, with a single bulk_write."""
+    return await bulk_response(todo_service.complete_todos, user_from_token.get("user_id"), body.task_descriptions)
+
+
 # --------------------------
 # Run server
 # --------------------------
@@ -0,0 +1,30 @@
+# repositories/rate_limit_repository.py
+"""Async data access for the rate_limits collection (one token bucket per key)."""
+from typing import Tuple
+from pymongo import ReturnDocument
+from config.dataBase import get_db
+
+
+async def take_token(key: str, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+    """Refill the bucket for the time elapsed and take one token, atomically on the server.
+
+    Returns (allowed, tokens left). Timing uses the server clock ($$NOW), so
+    workers with skewed clocks still share one consistent bucket.
+    """
+    elapsed_seconds = {"$divide": [{"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]}, 1000]}
+    refilled = {"$min": [capacity, {"$add": [{"$ifNull": ["$tokens", capacity]},
+                                              {"$multiply": [elapsed_seconds, refill_per_second]}]}]}
+    doc = await get_db().rate_limits.find_one_and_update(
+        {"_id": key},
+        [
+            {"$set": {"tokens": refilled, "updated_at": "$$NOW"}},
+            {"$set": {
+                "allowed": {"$gte": ["$tokens", 1]},
+                "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+            }},
+        ],
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+        projection={"allowed": 1, "tokens": 1},
+    )
+    return doc["allowed"], doc["tokens"]
@@ -0,0 +1,26 @@
+# repositories/session_repository.py
+"""Async data access for the chat_sessions collection (one document per user)."""
+from datetime import datetime
+from typing import Optional
+from config.dataBase import get_db
+
+
+def _sessions():
+    return get_db().chat_sessions
+
+
+async def find_session(user_id: str) -> Optional[dict]:
+    return await _sessions().find_one({"_id": user_id}, {"summary": 1, "turns": 1})
+
+
+async def save_session(user_id: str, summary: str, turns: list):
+    await _sessions().update_one(
+        {"_id": user_id},
+        {"$set": {"summary": summary, "turns": turns, "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+async def delete_session(user_id: str) -> int:
+    result = await _sessions().delete_one({"_id": user_id})
+    return result.deleted_count
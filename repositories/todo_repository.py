@@ -0,0 +1,226 @@
+# repositories/todo_repository.py
+"""Async data access for the todos collection.
+
+Every read/write on ``db.todos`` goes through here so handlers and agent tools
+never touch the driver directly.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+from config.dataBase import get_db
+
+
+def _todos():
+    return get_db().todos
+
+
+def _completed_filter(filter_type: str) -> Optional[bool]:
+    if filter_type == "pending":
+        return False
+    if filter_type == "completed":
+        return True
+    return None
+
+
+# ---------- READS ----------
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Fields the listing APIs render; user_id is implied by the query.
+LIST_PROJECTION = {"task": 1, "city": 1, "planned_time": 1, "completed": 1, "created_at": 1}
+PAGE_SORT = [("planned_time", ASCENDING), ("_id", ASCENDING)]
+
+
+def encode_cursor(todo: dict) -> str:
+    """Opaque keyset cursor pointing just past ``todo`` in (planned_time, _id) order."""
+    planned_time = todo.get("planned_time")
+    raw = {"t": planned_time, "id": str(todo["_id"])}
+    if isinstance(planned_time, datetime):
+        # tagged so the cursor compares against a BSON date, not a string
+        raw.update(t=planned_time.isoformat(), dt=1)
+    return base64.urlsafe_b64encode(json.dumps(raw).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    """Inverse of encode_cursor; raises ValueError for anything malformed."""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        after_time = datetime.fromisoformat(raw["t"]) if raw.get("dt") else raw["t"]
+        return after_time, ObjectId(raw["id"])
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _list_query(user_id: str, filter_type: str, cursor: Optional[str],
+                start: Optional[datetime] = None, end: Optional[datetime] = None) -> dict:
+    query = {"user_id": user_id}
+    completed = _completed_filter(filter_type)
+    if completed is not None:
+        query["completed"] = completed
+
+    # planned_time in [start, end): a range scan on the same (planned_time, _id) index
+    time_range = {}
+    if start is not None:
+        time_range["$gte"] = start
+    if end is not None:
+        time_range["$lt"] = end
+    if cursor:
+        after_time, after_id = decode_cursor(cursor)
+        # the $gte bound lets the index seek; the $or breaks planned_time ties by _id
+        time_range["$gte"] = after_time
+        query["$or"] = [{"planned_time": {"$gt": after_time}}, {"_id": {"$gt": after_id}}]
+    if time_range:
+        query["planned_time"] = time_range
+    return query
+
+
+async def find_todos_page(user_id: str, filter_type: str = "all", limit: int = DEFAULT_PAGE_SIZE,
+                          cursor: Optional[str] = None, start: Optional[datetime] = None,
+                          end: Optional[datetime] = None) -> Tuple[list, Optional[str]]:
+    """One page of the user's todos in planned_time order, plus the cursor for the next page.
+
+    ``start``/``end`` bound planned_time to [start, end). The cursor is ``None``
+    on the last page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = _list_query(user_id, filter_type, cursor, start, end)
+
+    # fetch one extra document to learn whether another page exists
+    todos = await _todos().find(query, LIST_PROJECTION).sort(PAGE_SORT).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = encode_cursor(todos[limit - 1]) if len(todos) > limit else None
+    return todos[:limit], next_cursor
+
+
+async def stream_todos(user_id: str, filter_type: str = "all", limit: Optional[int] = None,
+                       cursor: Optional[str] = None, batch_size: int = 200,
+                       start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Async-iterate the user's todos in page order straight off the driver cursor.
+
+    Nothing is materialized beyond one driver batch. With ``limit`` set, one
+    extra document is yielded so the caller can tell whether another page exists.
+    """
+    query = _list_query(user_id, filter_type, cursor, start, end)
+    mongo_cursor = _todos().find(query, LIST_PROJECTION, batch_size=batch_size).sort(PAGE_SORT)
+    if limit is not None:
+        mongo_cursor = mongo_cursor.limit(max(1, limit) + 1)
+    async for todo in mongo_cursor:
+        yield todo
+
+
+async def count_todos(user_id: str) -> dict:
+    """Total/pending/completed counts for the user in a single grouped pass."""
+    counts = {"total": 0, "pending": 0, "completed": 0}
+    pipeline = [{"$match": {"user_id": user_id}}, {"$group": {"_id": "$completed", "n": {"$sum": 1}}}]
+    async for row in _todos().aggregate(pipeline):
+        counts["completed" if row["_id"] else "pending"] += row["n"]
+        counts["total"] += row["n"]
+    return counts
+
+
+async def find_todo_by_id(todo_id: str, user_id: Optional[str] = None) -> Optional[dict]:
+    """One todo by id; pass ``user_id`` to only find it among that user's todos."""
+    query = {"_id": ObjectId(todo_id)}
+    if user_id is not None:
+        query["user_id"] = user_id
+    return await _todos().find_one(query)
+
+
+# Fields a match candidate needs; keeps full documents off the wire.
+MATCH_PROJECTION = {"task": 1, "city": 1, "planned_time": 1, "completed": 1}
+
+
+async def search_todos(user_id: str, text: str, include_completed: bool = False, limit: int = 5) -> list:
+    """Rank the user's todos against ``text`` with the task text index, best first.
+
+    Each result carries its relevance as ``score``.
+    """
+    query = {"user_id": user_id, "$text": {"$search": text}}
+    if not include_completed:
+        query["completed"] = False
+    cursor = (
+        _todos()
+        .find(query, {**MATCH_PROJECTION, "score": {"$meta": "textScore"}})
+        .sort([("score", {"$meta": "textScore"})])
+        .limit(limit)
+    )
+    return await cursor.to_list(length=limit)
+
+
+async def find_upcoming_cities(start: datetime, end: datetime) -> list:
+    """Distinct cities of pending todos (any user) planned between ``start`` and ``end``."""
+    return await _todos().distinct(
+        "city",
+        {"completed": False, "planned_time": {"$gte": start, "$lte": end}, "city": {"$nin": [None, ""]}},
+    )
+
+
+# ---------- VERSIONS ----------
+# Every write bumps a per-user counter in todo_versions, so read endpoints can
+# answer conditional GETs from this one tiny document instead of the todos.
+async def get_version(user_id: str) -> int:
+    doc = await get_db().todo_versions.find_one({"_id": user_id}, {"v": 1})
+    return doc["v"] if doc else 0
+
+
+async def bump_version(user_id: str):
+    await get_db().todo_versions.update_one({"_id": user_id}, {"$inc": {"v": 1}}, upsert=True)
+
+
+# ---------- WRITES ----------
+async def insert_todo(todo: dict) -> str:
+    result = await _todos().insert_one(todo)
+    await bump_version(todo["user_id"])
+    return str(result.inserted_id)
+
+
+async def update_todo(todo_id, updates: dict, user_id: Optional[str] = None) -> int:
+    """Apply ``$set`` updates to one todo and return the modified count.
+
+    Pass ``user_id`` when it is known: it scopes the update to that user's todo
+    and saves a lookup when bumping the version.
+    """
+    if not isinstance(todo_id, ObjectId):
+        todo_id = ObjectId(todo_id)
+    query = {"_id": todo_id}
+    if user_id is not None:
+        query["user_id"] = user_id
+    result = await _todos().update_one(query, {"$set": updates})
+
+    if result.modified_count:
+        if user_id is None:
+            owner = await _todos().find_one({"_id": todo_id}, {"user_id": 1})
+            user_id = owner and owner.get("user_id")
+        if user_id:
+            await bump_version(user_id)
+    return result.modified_count
+
+
+async def insert_todos(todos: List[dict]) -> List[str]:
+    """Insert many todos in one round trip; one version bump per user."""
+    if not todos:
+        return []
+    result = await _todos().insert_many(todos)
+    for user_id in {t["user_id"] for t in todos}:
+        await bump_version(user_id)
+    return [str(todo_id) for todo_id in result.inserted_ids]
+
+
+async def update_todos(user_id: str, updates: List[Tuple[Any, dict]]) -> int:
+    """Apply every (todo_id, ``$set`` fields) pair to ``user_id``'s todos in one bulk_write.
+
+    Returns the total modified count; the version is bumped once if anything changed.
+    """
+    if not updates:
+        return 0
+    requests = [
+        UpdateOne({"_id": todo_id if isinstance(todo_id, ObjectId) else ObjectId(todo_id), "user_id": user_id},
+                  {"$set": fields})
+        for todo_id, fields in updates
+    ]
+    result = await _todos().bulk_write(requests, ordered=False)
+    if result.modified_count:
+        await bump_version(user_id)
+    return result.modified_count
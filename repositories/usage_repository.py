@@ -0,0 +1,60 @@
+# repositories/usage_repository.py
+"""Async data access for the usage collection: one document per agent run."""
+from datetime import datetime
+from typing import Optional
+from config.dataBase import get_db
+
+# group_by -> the $group key of the usage summaries
+GROUP_KEYS = {
+    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+    "user": "$user_id",
+    "tools": "$tool_sequence",
+    "model": "$model",
+}
+
+
+def _usage():
+    return get_db().usage
+
+
+async def insert_usage(record: dict):
+    await _usage().insert_one(record)
+
+
+async def summarize_usage(group_by: str, since: datetime, user_id: Optional[str] = None, limit: int = 50) -> list:
+    """Totals per group since ``since``, heaviest first.
+
+    Each row also carries the raw latency_ms / input_tokens / total_tokens
+    values so the caller can compute percentiles.
+    """
+    match = {"created_at": {"$gte": since}}
+    if user_id is not None:
+        match["user_id"] = user_id
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": GROUP_KEYS[group_by],
+            "requests": {"$sum": 1},
+            "model_turns": {"$sum": "$model_turns"},
+            "tool_calls": {"$sum": {"$size": "$tool_calls"}},
+            "input_tokens": {"$sum": "$input_tokens"},
+            "output_tokens": {"$sum": "$output_tokens"},
+            "total_tokens": {"$sum": "$total_tokens"},
+            "cost_usd": {"$sum": "$cost_usd"},
+            "latencies_ms": {"$push": "$latency_ms"},
+            "input_tokens_values": {"$push": "$input_tokens"},
+            "total_tokens_values": {"$push": "$total_tokens"},
+        }},
+        {"$sort": {"total_tokens": -1}},
+        {"$limit": limit},
+    ]
+    return await _usage().aggregate(pipeline).to_list(length=limit)
+
+
+async def find_heaviest_runs(since: datetime, user_id: Optional[str] = None, limit: int = 20) -> list:
+    """The most expensive individual runs since ``since`` (prompt, tools, tokens, latency)."""
+    query = {"created_at": {"$gte": since}}
+    if user_id is not None:
+        query["user_id"] = user_id
+    cursor = _usage().find(query, {"_id": 0}).sort([("total_tokens", -1)]).limit(limit)
+    return await cursor.to_list(length=limit)
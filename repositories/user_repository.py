@@ -0,0 +1,21 @@
+# repositories/user_repository.py
+"""Async data access for the users collection."""
+from typing import Optional
+from config.dataBase import get_db
+
+
+def _users():
+    return get_db().users
+
+
+async def find_user_by_email(email: str) -> Optional[dict]:
+    return await _users().find_one({"email": email})
+
+
+async def insert_user(user: dict) -> str:
+    result = await _users().insert_one(user)
+    return str(result.inserted_id)
+
+
+async def update_password_hash(user_id, hashed_password: str):
+    await _users().update_one({"_id": user_id}, {"$set": {"password": hashed_password}})
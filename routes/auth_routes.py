@@ -1,16 +1,18 @@
 from fastapi import APIRouter, HTTPException, status, Response, Depends
 from pydantic import BaseModel, EmailStr
-from config.dataBase import db
-from passlib.context import CryptContext
+from repositories import user_repository
+from services import password_hasher
+from services.rate_limiter import limit_by_ip
 from bson import ObjectId
 from utils.utils import create_access_token, verify_token
+from utils.log import get_logger
 import bcrypt
-print(bcrypt.__version__)
+
+logger = get_logger("auth")
+logger.debug("bcrypt %s", bcrypt.__version__)
 
 
-print("debugger123", db.users.find_one({"email": "zubairdsds@exsdsadample.com"}))
 auth_router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 
@@ -26,16 +28,14 @@ class LoginModel(BaseModel):
     password: str
 
 # ---------- SIGNUP ----------
-@auth_router.post("/signup")
-def signup_user(user: SignupModel, response: Response):
-    print("the section block",user.name)
-    existing_user = db.users.find_one({"email": user.email})
-    print("the user in the db", existing_user)
+@auth_router.post("/signup", dependencies=[Depends(limit_by_ip("signup"))])
+async def signup_user(user: SignupModel, response: Response):
+    existing_user = await user_repository.find_user_by_email(user.email)
     if existing_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-    hashed_password = pwd_context.hash(user.password)
-    print("hashPassword", hashed_password)
+    # bcrypt is CPU-bound; it runs on the dedicated hashing pool
+    hashed_password = await password_hasher.hash_password(user.password)
 
     new_user = {
         "name": user.name,
@@ -43,8 +43,8 @@ def signup_user(user: SignupModel, response: Response):
         "password": hashed_password
     }
 
-    result = db.users.insert_one(new_user)
-    user_id = str(result.inserted_id)
+    user_id = await user_repository.insert_user(new_user)
+    logger.info("signed up user %s", user_id)
 
     token_data = {
         "user_id": user_id,
@@ -62,17 +62,24 @@ def signup_user(user: SignupModel, response: Response):
     }
 
 # ---------- LOGIN ----------
-@auth_router.post("/login")
-def login_user(user: LoginModel, response: Response):
-    print("debugger",db.users.find_one({"email": "zubairdsds@exsdsadample.com"}))
-    
-    db_user = db.users.find_one({"email": user.email})
+@auth_router.post("/login", dependencies=[Depends(limit_by_ip("login"))])
+async def login_user(user: LoginModel, response: Response):
+    db_user = await user_repository.find_user_by_email(user.email)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    if not pwd_context.verify(user.password, db_user["password"]):
+    valid, new_hash = await password_hasher.verify_password(user.password, db_user["password"])
+    if not valid:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid password")
 
+    if new_hash:
+        # Stored with another cost factor; upgrade it now that we know the password
+        try:
+            await user_repository.update_password_hash(db_user["_id"], new_hash)
+            logger.info("re-hashed password for user %s", db_user["_id"])
+        except Exception as e:
+            logger.warning("could not re-hash password for user %s: %s", db_user["_id"], e)
+
     token_data = {
         "user_id": str(db_user["_id"]),
         "user_name": db_user["name"],
@@ -0,0 +1,71 @@
+"""Check that todo_service.update_todos pairs every todo with its own fields.
+
+Runs update_todos against a recording stub of todo_repository.update_todos (no
+database needed) on batches that mix blank, missing and real planned_time
+values, and exits non-zero if any todo would receive another todo's time or
+the call fails.
+
+    python scripts/check_bulk_updates.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+
+from repositories import todo_repository
+from services import todo_service
+from services.todo_service import TodoUpdate
+from utils.datetime_parser import parse_datetime_value
+
+A, B, C, D = (str(ObjectId()) for _ in range(4))
+
+# (updates, {todo_id: expected $set fields}); planned_time values are natural language, parsed on compare
+CASES = [
+    ([TodoUpdate(todo_id=A, planned_time=""), TodoUpdate(todo_id=B, planned_time="tomorrow 5pm")],
+     {B: {"planned_time": "tomorrow 5pm"}}),
+    ([TodoUpdate(todo_id=A, planned_time="   ", task="gym"), TodoUpdate(todo_id=B, planned_time="6am"),
+      TodoUpdate(todo_id=C, city="Lahore"), TodoUpdate(todo_id=D, planned_time="kal 9pm")],
+     {A: {"task": "gym"}, B: {"planned_time": "6am"}, C: {"city": "Lahore"}, D: {"planned_time": "kal 9pm"}}),
+    ([TodoUpdate(todo_id="not-an-id", planned_time="8am"), TodoUpdate(todo_id=A, planned_time="today 8pm")],
+     {A: {"planned_time": "today 8pm"}}),
+]
+
+
+async def run_case(updates, expected) -> bool:
+    written = {}
+
+    async def record(user_id, pairs):
+        written.update((str(todo_id), fields) for todo_id, fields in pairs)
+        return len(pairs)
+
+    todo_repository.update_todos = record
+    try:
+        await todo_service.update_todos("check-user", updates)
+    except Exception as e:
+        print(f"❌ update_todos raised {type(e).__name__}: {e}")
+        return False
+
+    want = {todo_id: {k: parse_datetime_value(v) if k == "planned_time" else v for k, v in fields.items()}
+            for todo_id, fields in expected.items()}
+    if written != want:
+        print(f"❌ wrote {written}, expected {want}")
+        return False
+    return True
+
+
+async def main() -> int:
+    failures = 0
+    for updates, expected in CASES:
+        failures += not await run_case(updates, expected)
+    if failures:
+        print(f"❌ {failures} of {len(CASES)} bulk update cases failed")
+        return 1
+    print(f"✅ All {len(CASES)} bulk update cases passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
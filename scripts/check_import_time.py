@@ -0,0 +1,76 @@
+"""Fail if a cold ``import main`` is over budget or touches the network.
+
+Imports main in fresh interpreters with ``-X importtime`` and MONGODB_URI
+pointing at an unresolvable host, so an import-time connection, DNS lookup or
+ping fails loudly instead of being hidden by a fast network. Reports the
+median wall time (interpreter startup subtracted) and the slowest modules,
+and exits non-zero if the median exceeds the budget so it can gate CI.
+
+    python scripts/check_import_time.py --budget 4.0 --runs 3
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "4.0"))
+OFFLINE_ENV = {
+    "MONGODB_URI": "mongodb+srv://import-check.invalid/",
+    "GOOGLE_API_KEY": "import-check",
+    "WEATHER_API_KEY": "import-check",
+}
+
+
+def run_import(code: str, importtime: bool = False):
+    args = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    env = {**os.environ, **OFFLINE_ENV, "PYTHONDONTWRITEBYTECODE": "1"}
+    start = time.perf_counter()
+    proc = subprocess.run(args, cwd=ROOT, env=env, capture_output=True, text=True)
+    return time.perf_counter() - start, proc
+
+
+def slowest_modules(stderr: str, top: int):
+    """(cumulative microseconds, module) of the slowest imports in -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET_SECONDS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = statistics.median(run_import("pass")[0] for _ in range(args.runs))
+    timings = []
+    for _ in range(args.runs):
+        elapsed, proc = run_import("import main", importtime=True)
+        if proc.returncode != 0:
+            print("❌ import main failed:")
+            print("\n".join(line for line in proc.stderr.splitlines() if not line.startswith("import time:")))
+            return 1
+        timings.append(elapsed - baseline)
+
+    median = statistics.median(timings)
+    print(f"import main: median {median:.2f}s over {args.runs} runs (budget {args.budget:.2f}s)")
+    for cumulative, name in slowest_modules(proc.stderr, args.top):
+        print(f"  {cumulative / 1e6:6.3f}s  {name}")
+
+    if median > args.budget:
+        print("❌ Cold import is over budget")
+        return 1
+    print("✅ Cold import within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""One-shot migration: ISO-string planned_time/created_at/completed_at -> BSON dates.
+
+Walks only the todos that still hold a string in one of those fields and
+rewrites them in unordered bulk_write batches. Re-running it is a no-op, so it
+is safe to run again after an interruption or while old clients still write
+strings. Values that are not ISO datetimes are reported and left untouched.
+
+    python scripts/migrate_todo_datetimes.py [--batch-size 1000] [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+
+from config.dataBase import get_db
+from services.todo_service import DATETIME_FIELDS
+
+STRING_FIELDS_QUERY = {"$or": [{field: {"$type": "string"}} for field in DATETIME_FIELDS]}
+
+
+def converted_fields(todo: dict) -> dict:
+    """The $set for one todo: every string datetime field it holds, parsed."""
+    updates = {}
+    for field in DATETIME_FIELDS:
+        value = todo.get(field)
+        if isinstance(value, str):
+            try:
+                updates[field] = datetime.fromisoformat(value)
+            except ValueError:
+                print(f"❌ {todo['_id']}: {field}={value!r} is not an ISO datetime; left as is")
+    return updates
+
+
+async def migrate(batch_size: int, dry_run: bool) -> int:
+    todos = get_db().todos
+    projection = {field: 1 for field in DATETIME_FIELDS}
+    batch, migrated = [], 0
+
+    async def flush():
+        nonlocal batch, migrated
+        if batch and not dry_run:
+            result = await todos.bulk_write(batch, ordered=False)
+            migrated += result.modified_count
+        elif batch:
+            migrated += len(batch)
+        batch = []
+
+    async for todo in todos.find(STRING_FIELDS_QUERY, projection, batch_size=batch_size):
+        updates = converted_fields(todo)
+        if updates:
+            # match the string again so a concurrent rewrite is never clobbered
+            query = {"_id": todo["_id"], **{field: todo[field] for field in updates}}
+            batch.append(UpdateOne(query, {"$set": updates}))
+        if len(batch) >= batch_size:
+            await flush()
+            print(f"… {migrated} todos migrated")
+    await flush()
+    return migrated
+
+
+async def main(batch_size: int, dry_run: bool):
+    migrated = await migrate(batch_size, dry_run)
+    remaining = await get_db().todos.count_documents(STRING_FIELDS_QUERY)
+    verb = "would be migrated" if dry_run else "migrated"
+    print(f"✅ {migrated} todos {verb}; {remaining} still hold string datetimes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.dry_run))
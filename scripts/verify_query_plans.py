@@ -0,0 +1,53 @@
+"""Fail if any hot query in config/indexes.HOT_QUERIES is planned as a COLLSCAN.
+
+Ensures the declared indexes exist first, then runs ``explain`` on every hot
+query against the configured MongoDB (MONGODB_URI). Exits non-zero on a
+collection scan so it can gate CI.
+
+    python scripts/verify_query_plans.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.dataBase import get_db
+from config.indexes import HOT_QUERIES, ensure_indexes
+
+
+def plan_stages(plan: dict):
+    """Yield every stage name in a (possibly nested) winning plan."""
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+async def explain(db, collection: str, query: dict, sort) -> list:
+    find_cmd = {"find": collection, "filter": query}
+    if sort:
+        find_cmd["sort"] = dict(sort)
+    result = await db.command("explain", find_cmd, verbosity="queryPlanner")
+    return list(plan_stages(result["queryPlanner"]["winningPlan"]))
+
+
+async def main() -> int:
+    db = get_db()
+    await ensure_indexes(db)
+
+    failures = 0
+    for collection, query, sort in HOT_QUERIES:
+        stages = await explain(db, collection, query, sort)
+        ok = "COLLSCAN" not in stages
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {collection} {query} sort={sort}: {' <- '.join(stages)}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,134 @@
+# services/conversation_memory.py
+"""Compact per-user chat memory replayed to todo_agent on every turn.
+
+Turns are stored in chat_sessions as plain text: the user's message, the reply
+and a short note per tool result. They are never stored as SDK run items, so
+nothing has to round-trip through the agents serializer. History is kept under
+MEMORY_TOKEN_BUDGET. Once it is over, the oldest turns are folded into a
+rolling summary, which is capped at MEMORY_SUMMARY_TOKENS by dropping its
+oldest lines.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+from repositories import session_repository
+
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "1200"))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "300"))
+TURN_CHARS = 1600  # a long todo listing is kept as its head; the agent can list again
+TOOL_NOTE_CHARS = 240
+SUMMARY_LINE_CHARS = 200
+
+_stats = {
+    "model_turns": 0,     # agent runs recorded
+    "routed_turns": 0,    # turns answered by the intent router, recorded for context
+    "input_tokens": 0,    # prompt tokens reported by the model over all agent runs
+    "history_tokens": 0,  # estimated tokens of replayed memory over all agent runs
+    "folded_turns": 0,    # turns moved into a rolling summary
+}
+
+
+def stats() -> dict:
+    model_turns = _stats["model_turns"] or 1
+    return {
+        **_stats,
+        "input_tokens_per_turn": round(_stats["input_tokens"] / model_turns, 1),
+        "history_tokens_per_turn": round(_stats["history_tokens"] / model_turns, 1),
+        "token_budget": MEMORY_TOKEN_BUDGET,
+    }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters each); Gemini's tokenizer is not available locally."""
+    return (len(text) + 3) // 4
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+@dataclass
+class ConversationMemory:
+    user_id: str
+    summary: str = ""
+    # each turn: {"user": str, "assistant": str, "tokens": int}
+    turns: List[dict] = field(default_factory=list)
+
+    def history_tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(t["tokens"] for t in self.turns)
+
+    def input_items(self) -> list:
+        """Prior conversation as agent input items, oldest first."""
+        items = []
+        if self.summary:
+            items.append({"role": "system", "content": f"Summary of the earlier conversation:\n{self.summary}"})
+        for turn in self.turns:
+            items.append({"role": "user", "content": turn["user"]})
+            items.append({"role": "assistant", "content": turn["assistant"]})
+        return items
+
+    def add_turn(self, user_message: str, reply: str, tool_outputs: Iterable = ()):
+        user_message = _clip(user_message, TURN_CHARS)
+        notes = [_clip(output, TOOL_NOTE_CHARS) for output in tool_outputs if output]
+        assistant = _clip(reply, TURN_CHARS) + (f"\n(Tool results: {' | '.join(notes)})" if notes else "")
+        self.turns.append({
+            "user": user_message,
+            "assistant": assistant,
+            "tokens": estimate_tokens(user_message) + estimate_tokens(assistant),
+        })
+        self._compact()
+
+    def _compact(self):
+        # keep at least the latest turn verbatim: it is what "that one" refers to
+        lines = self.summary.splitlines() if self.summary else []
+        while len(self.turns) > 1 and self.history_tokens() > MEMORY_TOKEN_BUDGET:
+            oldest = self.turns.pop(0)
+            lines.append(_clip(f"- User: {oldest['user']} → {oldest['assistant']}", SUMMARY_LINE_CHARS))
+            self.summary = "\n".join(lines)
+            _stats["folded_turns"] += 1
+
+        while lines and estimate_tokens(self.summary) > MEMORY_SUMMARY_TOKENS:
+            lines.pop(0)
+            self.summary = "\n".join(lines)
+
+
+async def load(user_id: str) -> ConversationMemory:
+    """The user's memory; empty (never an error) if none is stored or Mongo is unavailable."""
+    try:
+        doc = await session_repository.find_session(user_id)
+    except Exception as e:
+        print(f"❌ Could not load chat memory for {user_id}:", e)
+        doc = None
+    if not doc:
+        return ConversationMemory(user_id=user_id)
+    return ConversationMemory(user_id=user_id, summary=doc.get("summary", ""), turns=doc.get("turns", []))
+
+
+async def record_turn(memory: ConversationMemory, user_message: str, reply: Optional[str],
+                      tool_outputs: Iterable = (), input_tokens: Optional[int] = None):
+    """Append one finished turn, compact, and persist.
+
+    ``input_tokens`` is the model-reported prompt size of an agent run; leave it
+    None for turns the intent router answered.
+    """
+    if input_tokens is None:
+        _stats["routed_turns"] += 1
+    else:
+        _stats["model_turns"] += 1
+        _stats["input_tokens"] += input_tokens
+
+    memory.add_turn(user_message, reply or "", tool_outputs)
+    try:
+        await session_repository.save_session(memory.user_id, memory.summary, memory.turns)
+    except Exception as e:
+        print(f"❌ Could not save chat memory for {memory.user_id}:", e)
+
+
+def note_replayed(memory: ConversationMemory):
+    """Count the history about to be replayed towards history_tokens_per_turn."""
+    _stats["history_tokens"] += memory.history_tokens()
+
+
+async def clear(user_id: str) -> bool:
+    return bool(await session_repository.delete_session(user_id))
@@ -0,0 +1,121 @@
+# services/geocode_cache.py
+"""City -> (lat, lon) resolution with an in-process LRU in front of a Mongo collection.
+
+Coordinates never change, so after the first lookup of a city the
+openweathermap geo round trip is skipped for good, across restarts and workers.
+"""
+import os
+import re
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+from config.dataBase import get_db
+from utils.http_client import WEATHER_BASE_URL, get_http_client
+from utils.metrics import UPSTREAM_LATENCY
+
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "512"))
+
+# Short forms the agent prompt tells users they can use.
+CITY_ALIASES = {
+    "fsd": "faisalabad",
+    "lhr": "lahore",
+    "khi": "karachi",
+}
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+_lru: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+_stats = {"lru_hits": 0, "db_hits": 0, "misses": 0}
+
+
+def stats() -> dict:
+    return {**_stats, "entries": len(_lru)}
+
+
+def _fold(city: str) -> str:
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", city.lower())).strip()
+
+
+def normalize_city(city: str) -> str:
+    """Cache key for a city: lowercased, punctuation/whitespace collapsed, aliases expanded."""
+    key = _fold(city)
+    return CITY_ALIASES.get(key, key)
+
+
+def query_city(city: str) -> str:
+    """Name sent to /geo/1.0/direct: the user's text with aliases expanded, "city,country" commas kept."""
+    return CITY_ALIASES.get(_fold(city)) or _SPACES.sub(" ", city).strip()
+
+
+def in_memory(city: str) -> bool:
+    """True when geocode(city) is answered by the in-process LRU, with no /geo call."""
+    return normalize_city(city) in _lru
+
+
+async def is_known_city(city: str) -> bool:
+    """True for an alias, or a city already geocoded under a name that matches the text.
+
+    Only checks the cache, never openweathermap: "with Sara" may well geocode to
+    somewhere, so a match on the returned name is what makes the text a city.
+    """
+    key = normalize_city(city)
+    if key in CITY_ALIASES.values():
+        return True
+    doc = await get_db().geocodes.find_one({"_id": key}, {"name": 1})
+    return bool(doc and doc.get("name")) and _fold(doc["name"]) == key
+
+
+def _remember(key: str, coords: Tuple[float, float]):
+    _lru[key] = coords
+    _lru.move_to_end(key)
+    if len(_lru) > GEOCODE_CACHE_SIZE:
+        _lru.popitem(last=False)
+
+
+async def geocode(city: str, api_key: str) -> Optional[Tuple[float, float]]:
+    """Return (lat, lon) for a city, or None if openweathermap does not know it."""
+    key = normalize_city(city)
+
+    # Tier 1: in-process LRU
+    coords = _lru.get(key)
+    if coords is not None:
+        _lru.move_to_end(key)
+        _stats["lru_hits"] += 1
+        return coords
+
+    # Tier 2: shared Mongo collection, keyed by the normalized name
+    doc = await get_db().geocodes.find_one({"_id": key}, {"lat": 1, "lon": 1})
+    if doc:
+        coords = (doc["lat"], doc["lon"])
+        _remember(key, coords)
+        _stats["db_hits"] += 1
+        return coords
+
+    # Miss: ask openweathermap once. The key is only the cache id: punctuation
+    # is stripped from it, so "Paris, US" would lose its country qualifier.
+    _stats["misses"] += 1
+    with UPSTREAM_LATENCY.time(service="openweathermap", endpoint="geo"):
+        geo_resp = await get_http_client().get(
+            f"{WEATHER_BASE_URL}/geo/1.0/direct",
+            params={"q": query_city(city), "limit": 1, "appid": api_key}
+        )
+    geo_data = geo_resp.json()
+    if not geo_data:
+        return None
+
+    coords = (geo_data[0]["lat"], geo_data[0]["lon"])
+    await get_db().geocodes.update_one(
+        {"_id": key},
+        {"$set": {
+            "lat": coords[0],
+            "lon": coords[1],
+            "name": geo_data[0].get("name"),
+            "country": geo_data[0].get("country"),
+            "updated_at": datetime.utcnow(),
+        }},
+        upsert=True,
+    )
+    _remember(key, coords)
+    return coords
@@ -0,0 +1,147 @@
+# services/intent_router.py
+"""Deterministic fast path in front of todo_agent.
+
+Plain list/show requests, "mark X as done" and simple "remind me to X <time>
+[in <city>]" saves are recognised with precompiled patterns and handled
+directly, skipping the Gemini round trip; a save's "in <city>" must be an
+alias or a city already geocoded under that name. Anything with a second intent,
+wellness advice, a question, Roman Urdu time-of-day words, a reference like
+"that one", or an unresolved match is left to the agent; "I finished X" only
+bypasses it when a todo contains every word of X. route() returns the reply text, or None to delegate.
+"""
+import re
+from typing import Optional
+from services import geocode_cache, todo_service, weather_service
+from services.request_context import TodoRequestContext
+from utils.todos_html import format_planned_time
+
+ROUTED_LIST_SIZE = 20
+
+# Requests served without the model vs. handed to it
+stats = {"bypassed": 0, "delegated": 0}
+
+# A second action, advice or a question: not a "simple command"
+_DELEGATE = re.compile(
+    r"\?|\b(?:and|then|also|but|weather|plan|diet|exercise|workout|suggest|advice|why|how|should|"
+    r"update|change|move|reschedule|subah|sham|raat|dopeher|bajay|baje)\b",
+    re.IGNORECASE,
+)
+
+_LIST = re.compile(
+    r"^(?:please\s+)?(?:(?:show|list|view|display|see|give)(?:\s+me)?\s+)?"
+    r"(?:(?:my|all|the|of)\s+)*(?P<filter>pending|completed|done|finished)?\s*(?:(?:my|all|the)\s+)*"
+    r"(?:tasks|todos|to-dos|todo list)(?:\s+please)?[.!]?$",
+    re.IGNORECASE,
+)
+
+_COMPLETE = re.compile(
+    r"^(?:please\s+)?(?:mark\s+(?:my\s+|the\s+)?(?P<task>.+?)\s+(?:task\s+|todo\s+)?as\s+(?:done|complete|completed|finished)"
+    r"|(?:i\s+)?(?:finished|completed)\s+(?P<task2>.+?))[.!]?$",
+    re.IGNORECASE,
+)
+
+# "that one", "it", "the last one": only the agent (with conversation memory) can resolve these
+_REFERENCE = re.compile(r"\b(?:it|this|that|these|those|them|one|ones|last|previous|latest|same|other)\b", re.IGNORECASE)
+
+_SAVE = re.compile(r"^(?:please\s+)?(?:remind me to|add (?:a )?(?:task|todo)(?: to)?)\s+(?P<body>.+?)[.!]?$", re.IGNORECASE)
+_DAY = re.compile(r"\b(?:on\s+)?(?P<day>today|tomorrow|aj|kal|\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}/\d{4})\b", re.IGNORECASE)
+_CLOCK = re.compile(r"\b(?:at\s+)?(?P<clock>\d{1,2}(?::\d{2})?\s*(?:am|pm)|\d{1,2}:\d{2})(?!\w)", re.IGNORECASE)
+_CITY = re.compile(r"\s+in\s+(?P<city>[a-z][a-z .]*?)\s*$", re.IGNORECASE)
+_NOT_A_CITY = re.compile(r"\b(?:the|morning|afternoon|evening|night|minutes?|hours?|days?)\b", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+_FILTERS = {"pending": "pending", "completed": "completed", "done": "completed", "finished": "completed"}
+
+
+async def _route_list(user_id: str, filter_type: str, request_context: TodoRequestContext) -> str:
+    todos, next_cursor = await request_context.find_todos_page(user_id, filter_type, ROUTED_LIST_SIZE)
+    label = "" if filter_type == "all" else f"{filter_type} "
+    if not todos:
+        return f"You have no {label}todos."
+
+    lines = [f"Here are your {label}todos:"]
+    for t in todos:
+        where = f" ({t['city']})" if t.get("city") else ""
+        done = " ✅" if t.get("completed") else ""
+        lines.append(f"• {t.get('task', 'Untitled')} — {format_planned_time(t.get('planned_time'), '%B %d, %Y at %I:%M %p')}{where}{done}")
+    if next_cursor:
+        lines.append("…and more. Open your todo list to see everything.")
+    return "\n".join(lines)
+
+
+async def _route_complete(user_id: str, task: str, request_context: TodoRequestContext,
+                          statement: bool = False) -> Optional[str]:
+    if _REFERENCE.search(task):
+        return None
+    # "I finished work early" may just be a remark: only act on an exact-words match
+    result = await todo_service.complete_todo(user_id, task, require_all_terms=statement)
+    if not result["success"]:
+        return None  # no match, a tie or already done: let the agent talk it through
+    request_context.invalidate()
+    return result["message"]
+
+
+async def _route_save(user_id: str, body: str, request_context: TodoRequestContext) -> Optional[str]:
+    clock = _CLOCK.search(body)
+    if clock is None:
+        return None  # no explicit time: the agent asks for one
+    day = _DAY.search(body)
+
+    rest = body
+    for match in sorted(filter(None, (clock, day)), key=lambda m: m.start(), reverse=True):
+        rest = rest[:match.start()] + " " + rest[match.end():]
+    rest = _SPACES.sub(" ", rest).strip()
+
+    city = None
+    city_match = _CITY.search(rest)
+    if city_match:
+        city = city_match.group("city").strip()
+        if _NOT_A_CITY.search(city):
+            return None
+        rest = rest[:city_match.start()].strip()
+    task = rest
+    if not task:
+        return None
+
+    weather_note = ""
+    if city:
+        # "check in with Sara": only a city we already know by that name is trusted without the model
+        if not await geocode_cache.is_known_city(city):
+            return None
+        # the agent's rule: always check weather when a city is given
+        weather = await weather_service.get_weather(city)
+        if "error" in weather:
+            return None
+        weather_note = " " + weather_service.describe(city, weather)
+
+    planned_time = f"{day.group('day') if day else 'today'} {clock.group('clock')}"
+    result = await todo_service.save_todo(user_id, task, planned_time, city)
+    request_context.invalidate()
+    return result["message"] + weather_note
+
+
+async def route(user_id: str, user_input: str, request_context: TodoRequestContext) -> Optional[str]:
+    """Handle a simple command locally and return the reply, or None to delegate to the agent."""
+    text = _SPACES.sub(" ", user_input).strip()
+    reply = None
+
+    if not _DELEGATE.search(text):
+        list_match = _LIST.match(text)
+        if list_match:
+            filter_type = _FILTERS.get((list_match.group("filter") or "").lower(), "all")
+            reply = await _route_list(user_id, filter_type, request_context)
+        else:
+            complete_match = _COMPLETE.match(text)
+            if complete_match:
+                if complete_match.group("task"):
+                    reply = await _route_complete(user_id, complete_match.group("task"), request_context)
+                else:
+                    reply = await _route_complete(user_id, complete_match.group("task2"), request_context,
+                                                  statement=True)
+            else:
+                save_match = _SAVE.match(text)
+                if save_match:
+                    reply = await _route_save(user_id, save_match.group("body"), request_context)
+
+    stats["bypassed" if reply is not None else "delegated"] += 1
+    return reply
@@ -0,0 +1,141 @@
+# services/llm_admission.py
+"""Admission control in front of agent runs.
+
+At most LLM_MAX_CONCURRENCY runs talk to Gemini at once. Further requests
+wait in per-user queues served round-robin, so one chatty user cannot starve
+everyone else. The queue is bounded (LLM_MAX_QUEUE overall,
+LLM_MAX_QUEUED_PER_USER each) and a request that finds it full, or waits
+longer than LLM_QUEUE_TIMEOUT_SECONDS, is rejected at once with
+LLMOverloaded so the caller can answer 503 + Retry-After instead of piling
+more load onto a rate-limited upstream.
+"""
+import asyncio
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque
+from utils import metrics
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "50"))
+LLM_MAX_QUEUED_PER_USER = int(os.getenv("LLM_MAX_QUEUED_PER_USER", "3"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))
+LLM_RETRY_AFTER_SECONDS = int(os.getenv("LLM_RETRY_AFTER_SECONDS", "5"))
+
+WAIT_TIME = metrics.Histogram("llm_admission_wait_seconds", "Time agent runs waited for an LLM slot")
+REJECTED = metrics.Counter("llm_admission_rejected_total", "Agent runs turned away by admission control", ("reason",))
+
+_active = 0
+_queued = 0
+# user_id -> that user's waiters, oldest first; dict order is the round-robin order
+_waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+
+class LLMOverloaded(Exception):
+    """No LLM slot is available; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: int = LLM_RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def stats() -> dict:
+    return {
+        "active": _active,
+        "queued": _queued,
+        "waiting_users": len(_waiting),
+        "max_concurrency": LLM_MAX_CONCURRENCY,
+        "max_queue": LLM_MAX_QUEUE,
+    }
+
+
+def _reject(reason: str, message: str):
+    REJECTED.inc(reason=reason)
+    raise LLMOverloaded(message)
+
+
+def check(user_id: str):
+    """Fail fast if ``user_id`` could not even join the queue right now."""
+    if _active < LLM_MAX_CONCURRENCY and not _waiting:
+        return
+    if _queued >= LLM_MAX_QUEUE:
+        _reject("queue_full", "The assistant is busy right now. Please try again in a few seconds.")
+    if len(_waiting.get(user_id, ())) >= LLM_MAX_QUEUED_PER_USER:
+        _reject("user_queue_full", "You already have several requests waiting. Please wait for them to finish.")
+
+
+def _grant_next():
+    """Hand free slots to waiters, one user at a time in round-robin order."""
+    global _active, _queued
+    while _active < LLM_MAX_CONCURRENCY and _waiting:
+        user_id, queue = next(iter(_waiting.items()))
+        waiter = queue.popleft()
+        _queued -= 1
+        if queue:
+            _waiting.move_to_end(user_id)  # served one; back of the line
+        else:
+            del _waiting[user_id]
+        if not waiter.done():  # skip waiters that timed out or were cancelled
+            _active += 1
+            waiter.set_result(None)
+
+
+def _forget(user_id: str, waiter: asyncio.Future):
+    global _queued
+    queue = _waiting.get(user_id)
+    if queue and waiter in queue:
+        queue.remove(waiter)
+        _queued -= 1
+        if not queue:
+            del _waiting[user_id]
+
+
+async def acquire(user_id: str):
+    """Wait for an LLM slot; raises LLMOverloaded when the queue is full or the wait too long."""
+    global _active, _queued
+    check(user_id)
+    if _active < LLM_MAX_CONCURRENCY and not _waiting:
+        _active += 1
+        WAIT_TIME.observe(0)
+        return
+
+    waiter = asyncio.get_running_loop().create_future()
+    _waiting.setdefault(user_id, deque()).append(waiter)
+    _queued += 1
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.shield(waiter), LLM_QUEUE_TIMEOUT_SECONDS)
+    except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+        if waiter.done() and not waiter.cancelled():
+            release()  # granted just as we gave up: pass the slot on
+        else:
+            waiter.cancel()
+            _forget(user_id, waiter)
+        if isinstance(e, asyncio.CancelledError):
+            raise
+        _reject("timeout", "The assistant is busy right now. Please try again in a few seconds.")
+    finally:
+        WAIT_TIME.observe(time.perf_counter() - start)
+
+
+def release():
+    global _active
+    _active -= 1
+    _grant_next()
+
+
+@asynccontextmanager
+async def slot(user_id: str):
+    """``async with slot(user_id):`` around one agent run."""
+    await acquire(user_id)
+    try:
+        yield
+    finally:
+        release()
+
+
+metrics.register_collector("llm_admission_active", "Agent runs holding an LLM slot", "gauge", (),
+                           lambda: {(): _active})
+metrics.register_collector("llm_admission_queue_depth", "Agent runs waiting for an LLM slot", "gauge", (),
+                           lambda: {(): _queued})
@@ -0,0 +1,111 @@
+# services/password_hasher.py
+"""bcrypt hashing on a dedicated, bounded process pool.
+
+Hashes and verifies run in PASSWORD_HASH_WORKERS worker processes, so a
+login burst neither holds the GIL nor ties up Starlette's shared threadpool.
+At most PASSWORD_HASH_MAX_QUEUE calls may wait for a worker; beyond that the
+request is refused with 503 + Retry-After rather than queued behind seconds
+of CPU work.
+
+The cost factor comes from BCRYPT_ROUNDS. Hashes made with another cost are
+re-hashed on the next successful login (verify_password returns the new
+hash for the caller to store).
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from utils import metrics
+from utils.log import get_logger
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+PASSWORD_HASH_RETRY_AFTER_SECONDS = int(os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", "2"))
+
+# min == max == default: any stored hash with a different cost "needs update"
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+LATENCY = metrics.Histogram("password_hash_duration_seconds", "bcrypt call latency, including the wait for a worker",
+                            ("op",))
+REJECTED = metrics.Counter("password_hash_rejected_total", "bcrypt calls refused because the hash queue was full",
+                           ("op",))
+
+logger = get_logger("auth")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_inflight = 0  # running + waiting for a worker
+
+
+# ---------- WORKER FUNCTIONS (run in the pool) ----------
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+# ---------- POOL ----------
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # forkserver, not fork: workers must not inherit the Motor client's monitor
+        # threads or the log listener thread running in the serving process
+        _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS,
+                                        mp_context=multiprocessing.get_context("forkserver"))
+    return _executor
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(op: str, func, *args):
+    global _executor, _inflight
+    if _inflight >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        REJECTED.inc(op=op)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts are being processed. Please try again shortly.",
+            headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+        )
+    _inflight += 1
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_pool(), func, *args)
+    except BrokenProcessPool:
+        logger.error("password hash worker died; restarting the pool")
+        _executor = None  # the next call starts a fresh pool
+        raise
+    finally:
+        _inflight -= 1
+        LATENCY.observe(time.perf_counter() - start, op=op)
+
+
+# ---------- PUBLIC API ----------
+async def hash_password(password: str) -> str:
+    return await _run("hash", _hash, password)
+
+
+async def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """Returns (valid, new_hash); new_hash is set when the stored hash should be replaced."""
+    return await _run("verify", _verify_and_update, password, hashed)
+
+
+metrics.register_collector("password_hash_inflight", "bcrypt calls running or waiting for a worker", "gauge", (),
+                           lambda: {(): _inflight})
@@ -0,0 +1,128 @@
+# services/rate_limiter.py
+"""Token-bucket rate limiting for the expensive routes.
+
+Each route has a bucket of ``capacity`` requests that refills at
+``capacity / period`` per second: /chat and /chat/stream share one bucket
+per user; /auth/login and /auth/signup have one bucket per client IP. Quotas
+come from RATE_LIMIT_<ROUTE>="<requests>/<seconds>" env vars.
+
+The in-process backend is enough for a single worker. With several workers
+set RATE_LIMIT_BACKEND=mongo so every worker draws from the same buckets
+(rate_limits collection, updated atomically). Another store only needs
+RateLimitBackend.take; install it with set_backend().
+"""
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Tuple
+from fastapi import Depends, HTTPException, Request, status
+from repositories import rate_limit_repository
+from utils import metrics
+from utils.utils import verify_token
+
+DEFAULT_LIMITS = {
+    "chat": "20/60",     # each request can cost several Gemini calls
+    "login": "10/60",    # each request costs a bcrypt verify
+    "signup": "5/600",
+}
+MEMORY_BUCKETS_MAX = int(os.getenv("RATE_LIMIT_MEMORY_BUCKETS", "100000"))
+TRUST_FORWARDED_FOR = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+LIMITED = metrics.Counter("rate_limited_total", "Requests rejected by the rate limiter", ("route",))
+
+
+def parse_limit(value: str) -> Tuple[float, float]:
+    """'20/60' -> (capacity 20, refill 20/60 tokens per second)."""
+    requests, seconds = value.split("/")
+    capacity = float(requests)
+    return capacity, capacity / float(seconds)
+
+
+LIMITS: Dict[str, Tuple[float, float]] = {
+    route: parse_limit(os.getenv(f"RATE_LIMIT_{route.upper()}", default))
+    for route, default in DEFAULT_LIMITS.items()
+}
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+        """Take one token from ``key``'s bucket; returns (allowed, seconds until the next token)."""
+
+
+class MemoryBackend(RateLimitBackend):
+    """Buckets in this process; the least recently used are dropped beyond MEMORY_BUCKETS_MAX."""
+
+    def __init__(self, max_buckets: int = MEMORY_BUCKETS_MAX):
+        self.max_buckets = max_buckets
+        # key -> (tokens, monotonic time of the last update)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / refill_per_second
+
+
+class MongoBackend(RateLimitBackend):
+    """Buckets shared by every worker; fails open if Mongo is unreachable."""
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> Tuple[bool, float]:
+        try:
+            allowed, tokens = await rate_limit_repository.take_token(key, capacity, refill_per_second)
+        except Exception as e:
+            print(f"❌ Rate limit check failed for {key}, allowing:", e)
+            return True, 0.0
+        return allowed, 0.0 if allowed else (1 - tokens) / refill_per_second
+
+
+_backend: RateLimitBackend = MongoBackend() if os.getenv("RATE_LIMIT_BACKEND", "memory") == "mongo" else MemoryBackend()
+
+
+def set_backend(backend: RateLimitBackend):
+    global _backend
+    _backend = backend
+
+
+async def check(route: str, key: str):
+    """Consume one request of ``route``'s quota for ``key`` or raise 429 with Retry-After."""
+    capacity, refill_per_second = LIMITS[route]
+    allowed, retry_after = await _backend.take(f"{route}:{key}", capacity, refill_per_second)
+    if not allowed:
+        LIMITED.inc(route=route)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please slow down.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_user(route: str):
+    """Dependency: rate limit ``route`` per authenticated user (reuses the request's verify_token)."""
+    async def dependency(user_from_token=Depends(verify_token)):
+        await check(route, f"user:{user_from_token.get('user_id')}")
+    return dependency
+
+
+def limit_by_ip(route: str):
+    """Dependency: rate limit ``route`` per client IP, for routes used before login."""
+    async def dependency(request: Request):
+        await check(route, f"ip:{client_ip(request)}")
+    return dependency
@@ -0,0 +1,87 @@
+# services/request_context.py
+"""Per-/chat-request context handed to the agent run.
+
+Tools receive it through ``RunContextWrapper`` and read todos through its
+cache, so one /chat call queries Mongo at most once per distinct read. A page
+already fetched also answers smaller pages of the same listing, and a complete
+"all" listing answers the pending/completed views. Any write made during the
+turn drops the cache; tools may run concurrently (parallel_tool_calls), so a
+read that was in flight across a write is returned but not cached.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from repositories import todo_repository
+from repositories.todo_repository import encode_cursor
+
+# Totals over every request, exported at /metrics
+_stats = {"hits": 0, "misses": 0}
+
+
+def stats() -> dict:
+    return dict(_stats)
+
+
+@dataclass
+class TodoRequestContext:
+    user_id: str
+    # (user_id, filter_type, cursor) -> (limit fetched, todos, next_cursor)
+    _pages: Dict[tuple, Tuple[int, list, Optional[str]]] = field(default_factory=dict)
+    _counts: Dict[str, dict] = field(default_factory=dict)
+    queries: int = 0
+    cache_hits: int = 0
+    generation: int = 0  # bumped by invalidate(); reads started in an older generation are not stored
+
+    def _from_cache(self, user_id: str, filter_type: str, limit: int, cursor: Optional[str]):
+        cached = self._pages.get((user_id, filter_type, cursor))
+        if cached and cached[0] >= limit:
+            fetched, todos, next_cursor = cached
+            if len(todos) > limit:
+                next_cursor = encode_cursor(todos[limit - 1])
+            return todos[:limit], next_cursor
+
+        # a complete first page of "all" contains every pending/completed todo too
+        complete = self._pages.get((user_id, "all", None))
+        if cursor is None and filter_type in ("pending", "completed") and complete and complete[2] is None:
+            wanted = filter_type == "completed"
+            todos = [t for t in complete[1] if t.get("completed", False) == wanted]
+            next_cursor = encode_cursor(todos[limit - 1]) if len(todos) > limit else None
+            return todos[:limit], next_cursor
+        return None
+
+    async def find_todos_page(self, user_id: str, filter_type: str = "all",
+                              limit: int = todo_repository.DEFAULT_PAGE_SIZE,
+                              cursor: Optional[str] = None) -> Tuple[list, Optional[str]]:
+        """Cached todo_repository.find_todos_page; returns copies callers may mutate."""
+        limit = max(1, min(limit, todo_repository.MAX_PAGE_SIZE))
+        hit = self._from_cache(user_id, filter_type, limit, cursor)
+        if hit is not None:
+            self.cache_hits += 1
+            _stats["hits"] += 1
+            todos, next_cursor = hit
+        else:
+            self.queries += 1
+            _stats["misses"] += 1
+            generation = self.generation
+            todos, next_cursor = await todo_repository.find_todos_page(user_id, filter_type, limit, cursor)
+            if generation == self.generation:
+                self._pages[(user_id, filter_type, cursor)] = (limit, todos, next_cursor)
+        return [dict(t) for t in todos], next_cursor
+
+    async def count_todos(self, user_id: str) -> dict:
+        if user_id in self._counts:
+            self.cache_hits += 1
+            _stats["hits"] += 1
+            return dict(self._counts[user_id])
+        self.queries += 1
+        _stats["misses"] += 1
+        generation = self.generation
+        counts = await todo_repository.count_todos(user_id)
+        if generation == self.generation:
+            self._counts[user_id] = counts
+        return dict(counts)
+
+    def invalidate(self):
+        """Forget every cached read; called after any write in this request."""
+        self.generation += 1
+        self._pages.clear()
+        self._counts.clear()
@@ -0,0 +1,304 @@
+# services/todo_service.py
+"""Todo operations shared by the agent tools and the local intent router."""
+import asyncio
+import os
+import re
+from datetime import datetime
+from typing import List, Optional
+from bson import ObjectId
+from pydantic import BaseModel
+from repositories import todo_repository
+from services import weather_service
+from utils.datetime_parser import parse_datetime_value, parse_many
+from utils.todos_html import format_planned_time
+
+MATCH_CANDIDATES = 5
+DISPLAY_FORMAT = "%B %d, %Y at %I:%M %p"
+
+# Stored as BSON dates; rendered as ISO strings wherever todos leave the service
+DATETIME_FIELDS = ("planned_time", "created_at", "completed_at")
+
+# Most todos one bulk call may create or change
+MAX_BULK_TODOS = int(os.getenv("MAX_BULK_TODOS", "100"))
+
+# Fields a bulk update may set (besides completed, which also stamps completed_at)
+UPDATABLE_FIELDS = ("task", "planned_time", "city")
+
+# $text treats a leading "-" as negation and quotes as phrases; user text must not
+_SEARCH_UNSAFE = re.compile(r'["\\-]')
+_WORDS = re.compile(r"\w+")
+_FILLER_WORDS = {"a", "an", "the", "my", "to", "for", "of", "task", "todo"}
+
+
+class TodoInput(BaseModel):
+    """One new todo; planned_time is natural language (e.g. 'today 8am', 'kal 6 bajay')."""
+    task: str
+    planned_time: str
+    city: Optional[str] = None
+
+
+class TodoUpdate(BaseModel):
+    """Changes to one todo; fields left as null are not touched."""
+    todo_id: str
+    task: Optional[str] = None
+    planned_time: Optional[str] = None
+    city: Optional[str] = None
+    completed: Optional[bool] = None
+
+
+async def find_matching_todos(user_id: str, task_description: str, include_completed: bool = False,
+                              limit: int = MATCH_CANDIDATES) -> list:
+    """
+    Rank the user's todos against the task description, best match first.
+    Runs server-side on the task text index; each candidate carries a 'score'.
+    """
+    search_text = _SEARCH_UNSAFE.sub(" ", task_description).strip()
+    if not search_text:
+        return []
+    return await todo_repository.search_todos(user_id, search_text, include_completed, limit)
+
+
+def is_ambiguous(candidates: list) -> bool:
+    """True when the top two candidates score the same, so the best match is a coin toss."""
+    return len(candidates) > 1 and candidates[0]["score"] == candidates[1]["score"]
+
+
+def serialize_todo(todo: dict) -> dict:
+    """JSON-ready copy of a todo: string _id, ISO datetimes and a display time."""
+    out = dict(todo)
+    if "_id" in out:
+        out["_id"] = str(out["_id"])
+    if "planned_time" in out:
+        out["planned_time_formatted"] = format_planned_time(out["planned_time"], DISPLAY_FORMAT)
+    for key in DATETIME_FIELDS:
+        if isinstance(out.get(key), datetime):
+            out[key] = out[key].isoformat()
+    return out
+
+
+def describe_candidates(candidates: list) -> list:
+    return [
+        {"_id": str(c["_id"]), "task": c["task"], "planned_time": format_planned_time(c.get("planned_time"), DISPLAY_FORMAT),
+         "score": round(c["score"], 2)}
+        for c in candidates
+    ]
+
+
+def new_todo(user_id: str, task: str, planned_time: datetime, city: Optional[str],
+             created_at: Optional[datetime] = None) -> dict:
+    return {
+        "user_id": user_id,
+        "task": task,
+        "city": city,
+        "planned_time": planned_time,
+        "completed": False,
+        "created_at": created_at or datetime.utcnow(),
+    }
+
+
+async def save_todo(user_id: str, task: str, planned_time: Optional[str] = None, city: Optional[str] = None) -> dict:
+    """
+    Save a todo with parsed datetime.
+    planned_time should be in natural language (e.g., 'today 8am', 'tomorrow 3pm', '2025-10-30 14:00')
+    """
+    if not task:
+        return {"message": "Please provide a task description."}
+    if planned_time is None:
+        return {"message": "Please provide a planned time for the task."}
+
+    # Parse the datetime
+    parsed_datetime = parse_datetime_value(planned_time)
+    
+    await todo_repository.insert_todo(new_todo(user_id, task, parsed_datetime, city))
+    
+    # Format for display
+    formatted_time = parsed_datetime.strftime(DISPLAY_FORMAT)
+    
+    return {"message": f"✅ Task '{task}' saved successfully for {formatted_time} in {city or 'unspecified city'}."}
+
+
+async def plan_todo(user_id: str, task: str, planned_time: Optional[str] = None, city: Optional[str] = None) -> dict:
+    """
+    Save a todo and check the weather where it happens, in one step.
+    The time is parsed first (no I/O); the insert then runs concurrently with
+    the geocode + weather lookup, and both results come back together.
+    """
+    if not task:
+        return {"message": "Please provide a task description."}
+    if planned_time is None:
+        return {"message": "Please provide a planned time for the task."}
+
+    parsed_datetime = parse_datetime_value(planned_time)
+    insert = todo_repository.insert_todo(new_todo(user_id, task, parsed_datetime, city))
+    if city:
+        todo_id, weather = await asyncio.gather(insert, weather_service.get_weather(city))
+    else:
+        todo_id, weather = await insert, None
+
+    formatted_time = parsed_datetime.strftime(DISPLAY_FORMAT)
+    result = {
+        "saved": True,
+        "todo_id": todo_id,
+        "message": f"✅ Task '{task}' saved successfully for {formatted_time} in {city or 'unspecified city'}.",
+    }
+    if weather is not None:
+        result["weather"] = weather
+        if weather.get("error"):
+            result["message"] += f" Weather check failed: {weather['error']}"
+        else:
+            result["message"] += " " + weather_service.describe(city, weather)
+    return result
+
+
+def task_terms(text: str) -> set:
+    return {w for w in _WORDS.findall(text.lower()) if w not in _FILLER_WORDS}
+
+
+async def complete_todo(user_id: str, task_description: str, require_all_terms: bool = False) -> dict:
+    """
+    Mark the pending todo best matching the description as completed.
+    With require_all_terms, the match must contain every word of the description.
+    """
+    # Find matching todo
+    candidates = await find_matching_todos(user_id, task_description)
+    
+    if not candidates:
+        return {
+            "success": False,
+            "message": "No matching todo found. Please be more specific or list your todos first."
+        }
+    
+    if is_ambiguous(candidates):
+        return {
+            "success": False,
+            "candidates": describe_candidates(candidates),
+            "message": "Several pending todos match equally well. Ask the user which one they mean."
+        }
+    
+    matched_todo = candidates[0]
+    
+    if require_all_terms and not task_terms(task_description) <= task_terms(matched_todo["task"]):
+        return {
+            "success": False,
+            "message": "No todo matches every word of the description."
+        }
+    
+    # Update to completed
+    modified_count = await todo_repository.update_todo(
+        matched_todo["_id"],
+        {"completed": True, "completed_at": datetime.utcnow()},
+        user_id
+    )
+    
+    if modified_count > 0:
+        return {
+            "success": True,
+            "message": f"✅ Task '{matched_todo['task']}' marked as completed!"
+        }
+    
+    return {
+        "success": False,
+        "message": "Task was already completed or could not be updated."
+    }
+
+
+def _check_bulk_size(count: int):
+    if count > MAX_BULK_TODOS:
+        raise ValueError(f"At most {MAX_BULK_TODOS} todos can be changed in one call (got {count}).")
+
+
+async def save_todos(user_id: str, items: List[TodoInput]) -> dict:
+    """
+    Save many todos at once: every time is parsed in one pass and all todos are
+    written with a single insert_many. Items without a task or time are skipped.
+    """
+    _check_bulk_size(len(items))
+    valid, skipped = [], []
+    for item in items:
+        if item.task.strip() and item.planned_time.strip():
+            valid.append(item)
+        else:
+            skipped.append(item.task.strip() or "(no task)")
+    if not valid:
+        return {"success": False, "saved": [], "skipped": skipped,
+                "message": "Please provide a task and a planned time for each todo."}
+
+    created_at = datetime.utcnow()
+    times = parse_many(item.planned_time for item in valid)
+    todos = [new_todo(user_id, item.task.strip(), planned, item.city, created_at)
+             for item, planned in zip(valid, times)]
+    ids = await todo_repository.insert_todos(todos)
+
+    saved = [{"_id": todo_id, "task": todo["task"], "city": todo["city"],
+              "planned_time_formatted": todo["planned_time"].strftime(DISPLAY_FORMAT)}
+             for todo_id, todo in zip(ids, todos)]
+    lines = [f"'{t['task']}' for {t['planned_time_formatted']} in {t['city'] or 'unspecified city'}" for t in saved]
+    message = f"✅ Saved {len(saved)} task{'s' if len(saved) != 1 else ''}: " + "; ".join(lines) + "."
+    if skipped:
+        message += f" Skipped {len(skipped)} without a task or time: {', '.join(skipped)}."
+    return {"success": True, "saved": saved, "skipped": skipped, "message": message}
+
+
+async def update_todos(user_id: str, updates: List[TodoUpdate]) -> dict:
+    """
+    Apply many updates (by todo id) in one bulk_write. planned_time is parsed
+    from natural language; completed=true stamps completed_at.
+    """
+    _check_bulk_size(len(updates))
+    now = datetime.utcnow()
+    pairs, invalid = [], []
+    for update in updates:
+        # blank strings count as "not set", like null
+        fields = {key: value.strip() for key in UPDATABLE_FIELDS
+                  if (value := getattr(update, key)) is not None and value.strip()}
+        if update.completed is not None:
+            fields["completed"] = update.completed
+            fields["completed_at"] = now if update.completed else None
+        if not ObjectId.is_valid(update.todo_id) or not fields:
+            invalid.append(update.todo_id)
+            continue
+        pairs.append((ObjectId(update.todo_id), fields))
+
+    # Parse every time in one pass, over exactly the fields that carry one
+    timed = [fields for _, fields in pairs if "planned_time" in fields]
+    for fields, planned in zip(timed, parse_many(f["planned_time"] for f in timed)):
+        fields["planned_time"] = planned
+
+    modified = await todo_repository.update_todos(user_id, pairs)
+    message = f"✅ Updated {modified} of {len(updates)} todos."
+    if invalid:
+        message += f" Ignored {len(invalid)} with an invalid id or nothing to change."
+    return {"success": modified > 0, "modified": modified, "invalid": invalid, "message": message}
+
+
+async def complete_todos(user_id: str, task_descriptions: List[str]) -> dict:
+    """
+    Mark the pending todo best matching each description as completed. The
+    matches are looked up concurrently and written with a single bulk_write;
+    unmatched or ambiguous descriptions are reported back instead.
+    """
+    _check_bulk_size(len(task_descriptions))
+    matches = await asyncio.gather(*(find_matching_todos(user_id, d) for d in task_descriptions))
+
+    chosen, not_found, ambiguous = {}, [], []
+    for description, candidates in zip(task_descriptions, matches):
+        if not candidates:
+            not_found.append(description)
+        elif is_ambiguous(candidates):
+            ambiguous.append({"description": description, "candidates": describe_candidates(candidates)})
+        else:
+            chosen[candidates[0]["_id"]] = candidates[0]["task"]  # two descriptions may name the same todo
+
+    now = datetime.utcnow()
+    modified = await todo_repository.update_todos(
+        user_id, [(todo_id, {"completed": True, "completed_at": now}) for todo_id in chosen]
+    )
+
+    message = (f"✅ Marked {modified} task{'s' if modified != 1 else ''} as completed: "
+               + ", ".join(f"'{task}'" for task in chosen.values()) + ".") if modified else "No todos were completed."
+    if not_found:
+        message += f" No pending todo matched: {', '.join(not_found)}."
+    if ambiguous:
+        message += " Several todos match equally well for some; ask the user which one they mean."
+    return {"success": modified > 0, "completed": list(chosen.values()), "not_found": not_found,
+            "ambiguous": ambiguous, "message": message}
@@ -0,0 +1,136 @@
+# services/usage_accounting.py
+"""Token, tool-call and cost accounting for agent runs.
+
+Every finished (or cancelled) /chat agent run is written to the usage
+collection with its model turns, input/output tokens, tool call sequence,
+latency and estimated cost. The summaries group those records per day, user,
+tool sequence or model, with latency and token percentiles.
+"""
+import asyncio
+import math
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+from agents import ToolCallItem
+from repositories import usage_repository
+
+# USD per million tokens; defaults are Gemini 2.0 Flash list prices
+PRICE_INPUT_PER_MTOK = float(os.getenv("USAGE_PRICE_INPUT_PER_MTOK", "0.10"))
+PRICE_OUTPUT_PER_MTOK = float(os.getenv("USAGE_PRICE_OUTPUT_PER_MTOK", "0.40"))
+PROMPT_CHARS = 200  # enough of the prompt to recognise it, not a transcript
+
+PERCENTILES = (50, 95, 99)
+
+# Users allowed to read other users' usage (comma-separated ids); everyone else sees only their own
+USAGE_ADMIN_USER_IDS = {u.strip() for u in os.getenv("USAGE_ADMIN_USER_IDS", "").split(",") if u.strip()}
+
+# in-flight record_run_soon tasks, referenced until done so they are not collected early
+_pending = set()
+
+
+def tool_calls(new_items) -> List[str]:
+    """Names of the tools a run called, in call order."""
+    names = []
+    for item in new_items:
+        if isinstance(item, ToolCallItem):
+            raw = item.raw_item
+            names.append(getattr(raw, "name", None) or (raw.get("name") if isinstance(raw, dict) else None) or "unknown")
+    return names
+
+
+def cost_usd(input_tokens: int, output_tokens: int) -> float:
+    return round((input_tokens * PRICE_INPUT_PER_MTOK + output_tokens * PRICE_OUTPUT_PER_MTOK) / 1_000_000, 8)
+
+
+def usage_record(result, user_id: str, endpoint: str, model: str, user_input: str,
+                 started: float, status: str = "ok") -> dict:
+    """Build the usage document for a run from its raw responses and items.
+
+    ``started`` is the time.perf_counter() value taken when the run began.
+    """
+    usages = [r.usage for r in result.raw_responses if r.usage]
+    input_tokens = sum(u.input_tokens for u in usages)
+    output_tokens = sum(u.output_tokens for u in usages)
+    calls = tool_calls(result.new_items)
+    return {
+        "user_id": user_id,
+        "endpoint": endpoint,
+        "model": model,
+        "status": status,
+        "created_at": datetime.utcnow(),
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "model_turns": len(result.raw_responses),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "cost_usd": cost_usd(input_tokens, output_tokens),
+        "tool_calls": calls,
+        "tool_sequence": " > ".join(calls) or "(none)",
+        "prompt": user_input[:PROMPT_CHARS],
+    }
+
+
+async def record_run(result, user_id: str, endpoint: str, model: str, user_input: str,
+                     started: float, status: str = "ok"):
+    """Persist one run's usage; accounting failures never fail the request."""
+    try:
+        await usage_repository.insert_usage(usage_record(result, user_id, endpoint, model, user_input, started, status))
+    except Exception as e:
+        print(f"❌ Could not record usage for {user_id}:", e)
+
+
+def record_run_soon(result, user_id: str, endpoint: str, model: str, user_input: str,
+                    started: float, status: str = "ok"):
+    """record_run in the background, off the response path (safe from a generator's finally)."""
+    task = asyncio.ensure_future(record_run(result, user_id, endpoint, model, user_input, started, status))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+def percentile(values: list, q: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def scope_user(caller_id: str, user_id: Optional[str], group_by: Optional[str] = None) -> Optional[str]:
+    """The user whose usage ``caller_id`` may read: their own, or anyone's (None = all) for admins.
+
+    Raises PermissionError for a non-admin asking about another user or grouping by user.
+    """
+    if caller_id in USAGE_ADMIN_USER_IDS:
+        return user_id
+    if (user_id is not None and user_id != caller_id) or group_by == "user":
+        raise PermissionError("Only usage admins can read other users' usage.")
+    return caller_id
+
+
+async def summary(group_by: str, days: int = 7, user_id: Optional[str] = None, limit: int = 50) -> list:
+    """Usage per ``group_by`` ('day', 'user', 'tools' or 'model') over the last ``days`` days."""
+    if group_by not in usage_repository.GROUP_KEYS:
+        raise ValueError(f"group_by must be one of {', '.join(usage_repository.GROUP_KEYS)}")
+    since = datetime.utcnow() - timedelta(days=days)
+    rows = await usage_repository.summarize_usage(group_by, since, user_id, limit)
+
+    out = []
+    for row in rows:
+        latencies = row.pop("latencies_ms")
+        input_values = row.pop("input_tokens_values")
+        total_values = row.pop("total_tokens_values")
+        row[group_by] = row.pop("_id")
+        row["cost_usd"] = round(row["cost_usd"], 6)
+        for q in PERCENTILES:
+            row[f"latency_ms_p{q}"] = percentile(latencies, q)
+            row[f"input_tokens_p{q}"] = percentile(input_values, q)
+            row[f"total_tokens_p{q}"] = percentile(total_values, q)
+        out.append(row)
+    if group_by == "day":
+        out.sort(key=lambda r: r["day"])
+    return out
+
+
+async def heaviest_runs(days: int = 7, user_id: Optional[str] = None, limit: int = 20) -> list:
+    return await usage_repository.find_heaviest_runs(datetime.utcnow() - timedelta(days=days), user_id, limit)
@@ -0,0 +1,84 @@
+# services/weather_cache.py
+"""Per-city TTL cache for current weather with single-flight request coalescing.
+
+Concurrent misses for the same city share one in-flight upstream request, so a
+burst of chats from one city costs a single openweathermap call per TTL window.
+"""
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+WEATHER_CACHE_TTL_SECONDS = float(os.getenv("WEATHER_CACHE_TTL_SECONDS", "600"))
+
+# city key -> (fetched_at monotonic seconds, raw weather payload)
+_entries: Dict[str, Tuple[float, dict]] = {}
+# city key -> the upstream fetch every concurrent caller awaits
+_inflight: Dict[str, asyncio.Task] = {}
+
+_stats = {
+    "hits": 0,        # fresh entry served
+    "misses": 0,      # no entry, fetched upstream
+    "stale": 0,       # entry older than the TTL, refetched
+    "coalesced": 0,   # joined a fetch already in flight
+    "stale_served": 0,  # refetch failed, expired entry served instead
+    "prefetched": 0,  # refreshed ahead of time by the background prefetcher
+}
+
+
+def stats() -> dict:
+    return {**_stats, "entries": len(_entries), "inflight": len(_inflight), "ttl_seconds": WEATHER_CACHE_TTL_SECONDS}
+
+
+def _fresh(entry: Tuple[float, dict], margin: float = 0.0) -> bool:
+    return time.monotonic() - entry[0] + margin < WEATHER_CACHE_TTL_SECONDS
+
+
+def expires_within(key: str, seconds: float) -> bool:
+    """True if ``key`` is missing or will be stale ``seconds`` from now."""
+    entry = _entries.get(key)
+    return entry is None or not _fresh(entry, margin=seconds)
+
+
+def _start_fetch(key: str, fetch: Callable[[], Awaitable[Optional[dict]]]) -> asyncio.Task:
+    async def run():
+        payload = await fetch()
+        if payload is not None:  # never cache "city not found"
+            _entries[key] = (time.monotonic(), payload)
+        return payload
+
+    task = asyncio.ensure_future(run())
+    _inflight[key] = task
+    task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+
+async def get_or_fetch(key: str, fetch: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+    """Return the cached payload for ``key``, calling ``fetch`` at most once per TTL window."""
+    entry = _entries.get(key)
+    if entry is not None and _fresh(entry):
+        _stats["hits"] += 1
+        return entry[1]
+
+    task = _inflight.get(key)
+    if task is not None:
+        _stats["coalesced"] += 1
+    else:
+        _stats["stale" if entry is not None else "misses"] += 1
+        task = _start_fetch(key, fetch)
+
+    try:
+        # shield: one caller giving up must not cancel the fetch the others are waiting on
+        return await asyncio.shield(task)
+    except Exception:
+        if entry is not None:
+            _stats["stale_served"] += 1
+            return entry[1]
+        raise
+
+
+async def refresh(key: str, fetch: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+    """Fetch ``key`` upstream now (joining a fetch already in flight) and store the result."""
+    task = _inflight.get(key) or _start_fetch(key, fetch)
+    _stats["prefetched"] += 1
+    return await asyncio.shield(task)
@@ -0,0 +1,94 @@
+# services/weather_prefetch.py
+"""Background refresh of the weather cache for cities with pending todos due soon.
+
+Runs inside the app lifespan. Each cycle collects the distinct cities of
+pending todos planned within the horizon and refreshes the ones whose cache
+entry would expire before the next cycle, with bounded concurrency and a cap
+on upstream calls per minute. Most weather lookups during /chat then hit the cache.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional
+from repositories import todo_repository
+from services import weather_cache
+from services.geocode_cache import in_memory, normalize_city
+from services.weather_service import fetch_current_weather
+
+PREFETCH_INTERVAL_SECONDS = float(os.getenv("WEATHER_PREFETCH_INTERVAL_SECONDS", "300"))
+PREFETCH_HORIZON_HOURS = float(os.getenv("WEATHER_PREFETCH_HORIZON_HOURS", "24"))
+PREFETCH_CONCURRENCY = int(os.getenv("WEATHER_PREFETCH_CONCURRENCY", "5"))
+PREFETCH_MAX_CALLS_PER_MINUTE = int(os.getenv("WEATHER_PREFETCH_MAX_CALLS_PER_MINUTE", "30"))
+
+_task: Optional[asyncio.Task] = None
+_call_times: deque = deque()  # monotonic timestamps of upstream fetches in the last minute
+
+
+def _take_call_slot(calls: int = 1) -> bool:
+    """Sliding one-minute window over upstream calls; False if ``calls`` more would exceed the cap."""
+    now = time.monotonic()
+    while _call_times and now - _call_times[0] >= 60:
+        _call_times.popleft()
+    if len(_call_times) + calls > PREFETCH_MAX_CALLS_PER_MINUTE:
+        return False
+    _call_times.extend([now] * calls)
+    return True
+
+
+async def prefetch_once() -> int:
+    """Run one prefetch cycle and return how many cities were refreshed."""
+    now = datetime.now()
+    cities = await todo_repository.find_upcoming_cities(now, now + timedelta(hours=PREFETCH_HORIZON_HOURS))
+
+    # Only refresh what would go stale before the next cycle
+    # cache key -> one spelling of the city to query upstream with
+    names = {normalize_city(c): c for c in cities if isinstance(c, str)}
+    due = [k for k in sorted(names) if k and weather_cache.expires_within(k, PREFETCH_INTERVAL_SECONDS)]
+
+    semaphore = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+    refreshed = 0
+
+    async def refresh(key: str):
+        nonlocal refreshed
+        async with semaphore:
+            # /weather, plus /geo unless the coordinates are already in memory (a Mongo hit only wastes a slot)
+            if not _take_call_slot(1 if in_memory(names[key]) else 2):
+                return  # over budget; the city is picked up again next cycle
+            try:
+                await weather_cache.refresh(key, lambda: fetch_current_weather(names[key]))
+                refreshed += 1
+            except Exception as e:
+                print(f"⚠️ Weather prefetch failed for {key}:", e)
+
+    await asyncio.gather(*(refresh(k) for k in due))
+    return refreshed
+
+
+async def _run_forever():
+    while True:
+        try:
+            refreshed = await prefetch_once()
+            if refreshed:
+                print(f"🌤️ Prefetched weather for {refreshed} cities")
+        except Exception as e:
+            print("❌ Weather prefetch cycle failed:", e)
+        await asyncio.sleep(PREFETCH_INTERVAL_SECONDS)
+
+
+def start_prefetcher():
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_run_forever())
+
+
+async def stop_prefetcher():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
@@ -0,0 +1,83 @@
+# services/weather_service.py
+"""Weather lookups against openweathermap, shared by the agent tools."""
+import os
+from typing import Optional
+from dotenv import load_dotenv
+from services import weather_cache
+from services.geocode_cache import geocode, normalize_city
+from utils.http_client import WEATHER_BASE_URL, get_http_client
+from utils.metrics import ERRORS, UPSTREAM_LATENCY
+
+load_dotenv()
+WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
+
+
+def analyze_suitability(city: str, weather_data: dict) -> dict:
+    """Turn a raw /data/2.5/weather payload into the tool's verdict."""
+    condition = weather_data["weather"][0]["main"].lower()
+    description = weather_data["weather"][0]["description"].capitalize()
+    temp_c = weather_data["main"]["temp"]
+
+    # Analyze suitability
+    is_suitable = True
+    issues = []
+
+    if condition in ["rain", "drizzle", "thunderstorm", "snow"]:
+        is_suitable = False
+        issues.append(f"precipitation ({description})")
+
+    if temp_c > 35:
+        is_suitable = False
+        issues.append(f"extreme heat ({temp_c}°C)")
+    elif temp_c < 5:
+        is_suitable = False
+        issues.append(f"extreme cold ({temp_c}°C)")
+
+    return {
+        "city": city,
+        "condition": description,
+        "temperature_c": temp_c,
+        "is_suitable": is_suitable,
+        "issues": issues,
+        "recommendation": "Good conditions" if is_suitable else f"Not ideal: {', '.join(issues)}"
+    }
+
+
+def describe(city: str, verdict: dict) -> str:
+    """One-line summary of an analyze_suitability verdict for chat replies."""
+    return f"Weather in {city}: {verdict['condition']}, {verdict['temperature_c']}°C — {verdict['recommendation']}."
+
+
+async def fetch_current_weather(city: str) -> Optional[dict]:
+    """Raw current-weather payload for a city as the user wrote it, or None if the city is unknown."""
+    # Coordinates come from the geocode cache; only the first lookup of a city hits /geo
+    coords = await geocode(city, WEATHER_API_KEY)
+    if coords is None:
+        return None
+
+    lat, lon = coords
+    with UPSTREAM_LATENCY.time(service="openweathermap", endpoint="weather"):
+        weather_resp = await get_http_client().get(
+            f"{WEATHER_BASE_URL}/data/2.5/weather",
+            params={"lat": lat, "lon": lon, "appid": WEATHER_API_KEY, "units": "metric"}
+        )
+    weather_resp.raise_for_status()  # keep error payloads out of the cache
+    return weather_resp.json()
+
+
+async def get_weather(city: str) -> dict:
+    """Current weather verdict for a city, served from the TTL cache when fresh."""
+    if not city:
+        return {"error": "Please provide a city name."}
+
+    key = normalize_city(city)
+    try:
+        weather_data = await weather_cache.get_or_fetch(key, lambda: fetch_current_weather(city))
+        if weather_data is None:
+            return {"error": f"City '{city}' not found."}
+
+        return analyze_suitability(city, weather_data)
+
+    except Exception as e:
+        ERRORS.inc(component="weather", kind=type(e).__name__)
+        return {"error": str(e)}
@@ -0,0 +1,147 @@
+# utils/datetime_parser.py
+"""Natural-language (English / Roman Urdu) time expressions -> datetimes.
+
+The input is split into tokens by one precompiled pattern (dates, clock times,
+words), so Roman Urdu words are only recognised as whole words ("kal" inside
+another word is left alone) and date digits are never mistaken for the hour.
+Results are memoized on (normalized input, reference date): everything a
+result depends on.
+"""
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_HOUR = 9
+
+_TOKEN = re.compile(
+    r"""
+      (?P<iso>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})          # 2025-10-30
+    | (?P<us_m>\d{1,2})[/-](?P<us_d>\d{1,2})[/-](?P<us_y>\d{4})     # 10/30/2025, 10-30-2025
+    | (?<!\d)(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<ampm>[ap])\.?m\b\.?   # 8am, 3:30 pm, 8 a.m.
+    | (?<!\d)(?P<hour24>\d{1,2})(?::(?P<minute24>\d{2}))?(?!\d)                  # 14:00, 6 (bajay)
+    | (?P<word>[a-z]+)
+    """,
+    re.VERBOSE,
+)
+_SPACES = re.compile(r"\s+")
+
+# word -> days from the reference date
+DAY_WORDS = {
+    "today": 0, "aj": 0, "aaj": 0, "tonight": 0,
+    "tomorrow": 1, "kal": 1,
+}
+
+# word -> part of day used to place a bare hour
+PERIOD_WORDS = {
+    "morning": "morning", "subah": "morning",
+    "afternoon": "afternoon", "dopeher": "afternoon", "dopahar": "afternoon",
+    "evening": "evening", "sham": "evening",
+    "night": "night", "raat": "night", "tonight": "night",
+}
+
+# "o'clock": a bare hour before these words with no part of day is read as
+# spoken ("6 bajay" is 18:00): 1-6 afternoon/evening, 7-12 morning/noon
+BAJAY_WORDS = {"bajay", "baje", "bajey", "bje"}
+BAJAY_PM_HOURS = range(1, 7)
+
+
+def _apply_period(hour: int, period: Optional[str]) -> int:
+    if period == "pm":
+        return hour + 12 if hour != 12 else hour
+    if period == "am":
+        return 0 if hour == 12 else hour
+    if period == "morning":
+        return 0 if hour == 12 else hour
+    if period in ("afternoon", "evening"):
+        return hour + 12 if hour < 12 else hour
+    if period == "night":
+        if hour == 12:
+            return 0
+        return hour + 12 if 6 <= hour < 12 else hour  # "10 raat" is 22:00, "2 raat" is 02:00
+    return hour
+
+
+def tokenize(text: str) -> Iterator[re.Match]:
+    return _TOKEN.finditer(text)
+
+
+def normalize(time_input: str) -> str:
+    return _SPACES.sub(" ", time_input.lower()).strip()
+
+
+@lru_cache(maxsize=4096)
+def _parse(normalized: str, reference: date) -> datetime:
+    target_date = reference
+    day_word_seen = False
+    explicit_date = None
+    clock: Optional[Tuple[int, int, Optional[str]]] = None  # (hour, minute, am/pm)
+    period = None
+    bajay = False
+
+    for token in tokenize(normalized):
+        word = token.group("word")
+        if word:
+            if word in DAY_WORDS and not day_word_seen:
+                day_word_seen = True
+                target_date = reference + timedelta(days=DAY_WORDS[word])
+            if word in PERIOD_WORDS and period is None:
+                period = PERIOD_WORDS[word]
+            if word in BAJAY_WORDS:
+                bajay = True
+
+        elif token.group("iso") or token.group("us_y"):
+            if explicit_date is None:
+                try:
+                    if token.group("iso"):
+                        explicit_date = date(int(token.group("iso")), int(token.group("iso_m")), int(token.group("iso_d")))
+                    else:
+                        explicit_date = date(int(token.group("us_y")), int(token.group("us_m")), int(token.group("us_d")))
+                except ValueError:
+                    pass  # impossible date, e.g. 2025-02-30
+
+        elif clock is None:
+            if token.group("hour"):
+                hour, minute, ampm = int(token.group("hour")), int(token.group("minute") or 0), token.group("ampm") + "m"
+                valid = 1 <= hour <= 12
+            else:
+                hour, minute, ampm = int(token.group("hour24")), int(token.group("minute24") or 0), None
+                valid = hour <= 23
+            if valid and minute <= 59:
+                clock = (hour, minute, ampm)
+
+    if explicit_date and not day_word_seen:
+        target_date = explicit_date
+
+    hour, minute = DEFAULT_HOUR, 0
+    if clock is not None:
+        hour, minute, ampm = clock
+        if bajay and not ampm and period is None and hour in BAJAY_PM_HOURS:
+            ampm = "pm"
+        hour = _apply_period(hour, ampm or period)
+
+    return datetime(target_date.year, target_date.month, target_date.day, hour, minute)
+
+
+def parse_datetime_value(time_input: str, now: Optional[datetime] = None) -> datetime:
+    """
+    Parse natural language time input into a datetime.
+    Handles: 'today', 'tomorrow', specific dates, times, and Urdu/Roman Urdu
+    """
+    reference = (now or datetime.now()).date()
+    return _parse(normalize(time_input), reference)
+
+
+def parse_datetime(time_input: str, now: Optional[datetime] = None) -> str:
+    """Parse natural language time input into an ISO datetime string."""
+    return parse_datetime_value(time_input, now).isoformat()
+
+
+def parse_many(time_inputs: Iterable[str], now: Optional[datetime] = None) -> List[datetime]:
+    """Parse many expressions against one reference date; repeats are served from the memo."""
+    reference = (now or datetime.now()).date()
+    return [_parse(normalize(t), reference) for t in time_inputs]
+
+
+def cache_info():
+    return _parse.cache_info()
@@ -0,0 +1,21 @@
+# utils/etag.py
+"""Weak ETags for per-user todo reads, derived from the todo_versions counter."""
+import hashlib
+from fastapi import Request
+
+
+def make_etag(user_id: str, version: int, *variant) -> str:
+    """ETag for one representation (format/filter/page) of a user's todos at ``version``."""
+    raw = ":".join(str(part) for part in (user_id, version, *variant))
+    return f'W/"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names ``etag`` (or is ``*``)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    # weak comparison: W/"x" and "x" name the same representation
+    bare = etag[2:]
+    return "*" in tags or any(tag == etag or tag == bare or tag[2:] == bare for tag in tags)
@@ -0,0 +1,36 @@
+# utils/http_client.py
+"""Process-wide pooled httpx client, opened and closed by the FastAPI lifespan."""
+from typing import Optional
+import httpx
+
+WEATHER_BASE_URL = "https://api.openweathermap.org"
+
+HTTP_TIMEOUT = httpx.Timeout(connect=3.0, read=10.0, write=5.0, pool=5.0)
+HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use outside the lifespan (scripts, REPL)."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(http2=True, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+    return _http_client
+
+
+async def start_http_client():
+    """Open the pool and pay the TCP+TLS handshake to openweathermap before the first request."""
+    http_client = get_http_client()
+    try:
+        await http_client.head(WEATHER_BASE_URL)
+        print("✅ HTTP pool warmed up for", WEATHER_BASE_URL)
+    except httpx.HTTPError as e:
+        print("⚠️ HTTP pool warm-up failed:", e)
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,34 @@
+# utils/llm_metrics.py
+"""Model-call timing for agent runs, recorded into utils.metrics.LLM_LATENCY.
+
+Kept apart from utils.metrics so the Mongo layer and scripts that only need
+the registry do not import the agents SDK.
+"""
+import time
+from typing import Any, Dict
+from agents import RunHooks
+from utils.metrics import LLM_LATENCY
+
+
+class LLMTimingHooks(RunHooks):
+    """Run hooks timing each model call; pass as ``hooks=`` to Runner.run / run_streamed."""
+
+    def __init__(self):
+        # id(run context) -> perf_counter at on_llm_start; a run makes one model call at a time
+        self._started: Dict[int, float] = {}
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        self._started[id(context)] = time.perf_counter()
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        start = self._started.pop(id(context), None)
+        if start is not None:
+            LLM_LATENCY.observe(time.perf_counter() - start, agent=agent.name, model=_model_name(agent))
+
+    async def on_agent_end(self, context, agent, output: Any) -> None:
+        self._started.pop(id(context), None)  # a failed call never reaches on_llm_end
+
+
+def _model_name(agent) -> str:
+    model = agent.model
+    return model if isinstance(model, str) else getattr(model, "model", type(model).__name__)
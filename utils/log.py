@@ -0,0 +1,38 @@
+# utils/log.py
+"""Leveled, non-blocking logging.
+
+Loggers from get_logger() only put records on an in-memory queue; one
+QueueListener thread does the blocking write to stderr, so request handlers
+never wait on console I/O. Records below LOG_LEVEL (default INFO) are
+dropped before any formatting happens.
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener = None
+
+
+def _start_listener():
+    global _listener
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    _listener = logging.handlers.QueueListener(_queue, handler)
+    _listener.start()
+    atexit.register(_listener.stop)  # flush what is still queued on exit
+
+
+def get_logger(name: str) -> logging.Logger:
+    if _listener is None:
+        _start_listener()
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.addHandler(logging.handlers.QueueHandler(_queue))
+        logger.setLevel(LOG_LEVEL)
+        logger.propagate = False
+    return logger
@@ -0,0 +1,204 @@
+# utils/metrics.py
+"""In-process metrics registry exported in the Prometheus text format at /metrics.
+
+Counters and histograms are plain dicts keyed by label values. Everything runs
+on one event loop, so no locking is needed. Stats that modules already keep
+(weather cache, geocode cache, intent router) are read at scrape time through
+collectors rather than counted twice.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Tuple
+from pymongo import monitoring
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# seconds; covers a cached Mongo read (~1 ms) up to a slow multi-turn Gemini run
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_metrics: List["_Metric"] = []
+# (name, help, type, label names, fn returning {label values: value})
+_collectors: List[Tuple[str, str, str, Tuple[str, ...], Callable[[], Dict[tuple, float]]]] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        _metrics.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, seconds: float, **labels):
+        key = self._key(labels)
+        series = self._values.get(key)
+        if series is None:
+            series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, seconds)] += 1
+        series[1] += seconds
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % ("+Inf" if bound == float("inf") else _number(bound))
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+def register_collector(name: str, help: str, kind: str, labelnames: Tuple[str, ...],
+                       collect: Callable[[], Dict[tuple, float]]):
+    """Export values computed at scrape time, e.g. from a module's existing stats dict."""
+    _collectors.append((name, help, kind, tuple(labelnames), collect))
+
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for name, help, kind, labelnames, collect in _collectors:
+        lines.extend([f"# HELP {name} {help}", f"# TYPE {name} {kind}"])
+        try:
+            values = collect()
+        except Exception as e:
+            print(f"❌ Metrics collector {name} failed:", e)
+            continue
+        for key, value in values.items():
+            lines.append(f"{name}{_labels(labelnames, key)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# ---------- METRICS ----------
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP handler latency, including streamed bodies",
+                         ("method", "route", "status"))
+TOOL_LATENCY = Histogram("agent_tool_duration_seconds", "Agent tool call latency", ("tool",))
+MONGO_LATENCY = Histogram("mongo_command_duration_seconds", "MongoDB command latency", ("command",))
+UPSTREAM_LATENCY = Histogram("upstream_request_duration_seconds", "Third-party API latency", ("service", "endpoint"))
+LLM_LATENCY = Histogram("llm_call_duration_seconds", "Model call latency per agent turn", ("agent", "model"))
+ERRORS = Counter("errors_total", "Errors by component", ("component", "kind"))
+
+
+# ---------- INSTRUMENTATION ----------
+def timed_tool(func):
+    """Time an agent tool; apply beneath @function_tool (functools.wraps keeps its schema)."""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            ERRORS.inc(component="tool", kind=type(e).__name__)
+            raise
+        finally:
+            TOOL_LATENCY.observe(time.perf_counter() - start, tool=func.__name__)
+    return wrapper
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every request until its last body chunk is sent.
+
+    Routes are labelled by their path template (``/todos/agenda``, not the raw
+    URL) so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+            if status[0] >= 500:
+                ERRORS.inc(component="http", kind=str(status[0]))
+        except Exception as e:
+            ERRORS.inc(component="http", kind=type(e).__name__)
+            raise
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_LATENCY.observe(time.perf_counter() - start, method=scope["method"], route=route, status=status[0])
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """pymongo command listener; pass it in the client's ``event_listeners``."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, command=event.command_name)
+        ERRORS.inc(component="mongo", kind=event.command_name)
@@ -0,0 +1,157 @@
+# utils/todos_html.py
+"""Todos dashboard renderer.
+
+The page is split into fragments compiled once at import. The streaming
+renderer yields the header as soon as counts are known and then one chunk per
+todo straight off the Mongo cursor, so time-to-first-byte and memory stay flat
+however long the list is. Styles live in static/todos.css, which browsers cache.
+Pages embedded elsewhere (the /chat HTML reply) pass an absolute ``base_url``
+so the stylesheet and links resolve against this service, not the host page.
+
+Every page endpoint needs an ``Authorization: Bearer`` header, which a plain
+link click never sends, so "Load more" is a button carrying the next page's
+URL and cursor in ``data-`` attributes for the client to fetch with its token.
+"""
+from datetime import datetime
+from html import escape
+from typing import AsyncIterable, Callable, Iterable, Optional
+from repositories.todo_repository import encode_cursor
+
+TITLES = {"pending": "Pending Tasks", "completed": "Completed Tasks"}
+
+_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <link rel="stylesheet" href="{base_url}static/todos.css">
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>📝 {title}</h1>
+            <p>Manage your tasks efficiently</p>
+        </div>
+
+        <div class="stats">
+            <div class="stat-card">
+                <h3>{total}</h3>
+                <p>Total Tasks</p>
+            </div>
+            <div class="stat-card">
+                <h3>{pending}</h3>
+                <p>Pending</p>
+            </div>
+            <div class="stat-card">
+                <h3>{completed}</h3>
+                <p>Completed</p>
+            </div>
+        </div>
+
+        <div class="todos">
+""".format
+
+_ITEM = """            <div class="todo-item {status}">
+                <div class="task">{task}</div>
+                <div class="details">
+                    <div class="detail-item">📍 {city}</div>
+                    <div class="detail-item">🕐 {time}</div>
+                    <span class="status-badge {status}">{badge}</span>
+                </div>
+            </div>
+""".format
+
+_EMPTY = """            <div class="empty-state">
+                <svg viewBox="0 0 24 24" fill="none" stroke="currentColor">
+                    <path d="M9 5H7a2 2 0 00-2 2v12a2 2 0 002 2h10a2 2 0 002-2V7a2 2 0 00-2-2h-2M9 5a2 2 0 002 2h2a2 2 0 002-2M9 5a2 2 0 012-2h2a2 2 0 012 2" stroke-width="2" stroke-linecap="round"/>
+                </svg>
+                <h2>No tasks found</h2>
+                <p>Start adding tasks to see them here</p>
+            </div>
+"""
+
+_LOAD_MORE = """            <button type="button" class="load-more" data-next-url="{url}" data-next-cursor="{cursor}">Load more →</button>
+""".format
+
+_FOOT = """        </div>
+    </div>
+</body>
+</html>
+"""
+
+
+def format_planned_time(value, fmt: str = "%b %d, %Y at %I:%M %p") -> str:
+    """Human-readable planned time; unparseable values are shown as stored."""
+    try:
+        dt = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+        return dt.strftime(fmt)
+    except (TypeError, ValueError):
+        return value or ""
+
+
+def _head(filter_type: str, counts: dict, base_url: str = "/") -> str:
+    return _HEAD(title=TITLES.get(filter_type, "All Tasks"), base_url=escape(base_url), **counts)
+
+
+def _load_more(cursor: str, page_url: Callable[[str], str]) -> str:
+    return _LOAD_MORE(url=escape(page_url(cursor)), cursor=escape(cursor))
+
+
+def _item(todo: dict) -> str:
+    status = "completed" if todo.get("completed", False) else "pending"
+    return _ITEM(
+        status=status,
+        task=escape(str(todo.get("task", "Untitled"))),
+        city=escape(str(todo.get("city") or "N/A")),
+        time=escape(str(format_planned_time(todo.get("planned_time", "")))),
+        badge=status.upper(),
+    )
+
+
+def render_todos_html(todos: Iterable[dict], filter_type: str = "all", counts: Optional[dict] = None,
+                      next_cursor: Optional[str] = None, page_url: Optional[Callable[[str], str]] = None,
+                      base_url: str = "/") -> str:
+    """Render an already-fetched list of todos in one go.
+
+    Without ``counts`` the totals are computed from ``todos`` in a single pass.
+    With ``next_cursor`` the page ends with a "Load more" button for
+    ``page_url(next_cursor)``. ``base_url`` (ending in "/") prefixes the stylesheet URL.
+    """
+    todos = list(todos)
+    if counts is None:
+        completed = sum(1 for t in todos if t.get("completed", False))
+        counts = {"total": len(todos), "pending": len(todos) - completed, "completed": completed}
+
+    parts = [_head(filter_type, counts, base_url)]
+    parts.extend(_item(t) for t in todos)
+    if not todos:
+        parts.append(_EMPTY)
+    if next_cursor and page_url:
+        parts.append(_load_more(next_cursor, page_url))
+    parts.append(_FOOT)
+    return "".join(parts)
+
+
+async def stream_todos_html(todos: AsyncIterable[dict], filter_type: str, counts: dict,
+                            limit: Optional[int] = None,
+                            page_url: Optional[Callable[[str], str]] = None):
+    """Yield the page chunk by chunk while iterating ``todos``.
+
+    With ``limit`` set, ``todos`` may yield one extra document; if it does, the
+    page ends with a "Load more" button for ``page_url(next_cursor)``.
+    """
+    yield _head(filter_type, counts)
+
+    shown, last = 0, None
+    async for todo in todos:
+        if limit is not None and shown == limit:
+            if page_url:
+                yield _load_more(encode_cursor(last), page_url)
+            break
+        yield _item(todo)
+        shown, last = shown + 1, todo
+
+    if not shown:
+        yield _EMPTY
+    yield _FOOT
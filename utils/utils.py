@@ -3,11 +3,22 @@ from datetime import datetime, timedelta
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from bson import ObjectId
+from collections import OrderedDict
+import hashlib
+import os
+import time
+from utils.log import get_logger
 
 SECRET_KEY = "SUPER_SECRET_JWT_KEY"  # Replace with env var in production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
+# Verified claims by token digest; an entry is served only until the token's own exp
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+_verified: "OrderedDict[bytes, tuple]" = OrderedDict()  # digest -> (exp, payload)
+
+logger = get_logger("auth")
+
 # --- CREATE TOKEN ---
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -19,10 +30,35 @@ def create_access_token(data: dict):
 
 # --- VERIFY TOKEN DEPENDENCY ---
 
-def verify_token(request: Request):
-    """Verify JWT token from the Authorization header."""
+def _cached_claims(digest: bytes):
+    entry = _verified.get(digest)
+    if entry is None:
+        return None
+    exp, payload = entry
+    if exp <= time.time():
+        _verified.pop(digest, None)
+        return None
+    _verified.move_to_end(digest)
+    return dict(payload)
+
+
+def _remember_claims(digest: bytes, payload: dict):
+    exp = payload.get("exp")
+    if not isinstance(exp, (int, float)):
+        return  # never cache a token that does not expire
+    _verified[digest] = (exp, dict(payload))
+    if len(_verified) > TOKEN_CACHE_SIZE:
+        _verified.popitem(last=False)
+
+
+async def verify_token(request: Request):
+    """Verify JWT token from the Authorization header.
+
+    A token verified before is answered from the claims cache (one SHA-256
+    instead of a signature check and JSON decode) until it expires. Runs on
+    the event loop: it does no I/O, so it needs no threadpool hop.
+    """
     auth_header = request.headers.get("Authorization")
-    print("the token",auth_header)
 
     if not auth_header or not auth_header.startswith("Bearer "):
         raise HTTPException(
@@ -31,15 +67,21 @@ def verify_token(request: Request):
         )
 
     token = auth_header.split(" ")[1]
+    digest = hashlib.sha256(token.encode()).digest()
+
+    payload = _cached_claims(digest)
+    if payload is not None:
+        return payload
 
     try:
         # Decode and verify the JWT
-
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print("the fdecoded token", payload)
+        logger.debug("verified token %s for user %s", digest.hex()[:12], payload.get("user_id"))
+        _remember_claims(digest, payload)
         return payload  # e.g. { "user_id": "...", "user_name": "...", "user_email": "..." }
 
-    except JWTError:
+    except JWTError as e:
+        logger.info("rejected token %s: %s", digest.hex()[:12], e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token. Please log in again."